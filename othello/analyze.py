@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+'''
+analyze
+	Offline analysis of recorded games. Every game found in the telemetry files (*.jsonl) and game record
+	archives (*.rec) of a directory is replayed on a headless Board, and at each position the AI searches to
+	the given depth to find the best move. Each move is annotated with how much worse it was than the best
+	move (its loss), whether it was a blunder and whether a bunny bonus was available but not taken.
+	Games are spread across a pool of processes that share a cache of searched positions, so openings that
+	repeat across games are searched once. One JSON line is written per game as soon as it is analyzed and
+	the throughput is reported at the end.
+	Usage: analyze.py [-h] [-d DEPTH] [-j WORKERS] [-o OUTPUT] directory
+'''
+import argparse, json, multiprocessing, os, sys, time
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1') # keep stdout for the annotated games
+from othello import AI, Board, GameRecord
+
+DEPTH = 3 # default search depth
+BLUNDER = 10 # loss at which a move is a blunder
+
+_cache = None # position key : (relative value, best square), shared between workers
+_depth = DEPTH
+
+
+def read_games(directory):
+	'''
+	read_games reads the games recorded in the telemetry files and game record archives of a directory,
+	one file at a time
+		directory : directory of telemetry files and archives
+		return
+		generator of games, each a dict of the game id, dimension, bunnies and list of (player, square) moves
+	'''
+	for name in sorted(os.listdir(directory)):
+		path = os.path.join(directory, name)
+		if not os.path.isfile(path):
+			continue
+		if name.endswith('.rec'):
+			for i, record in enumerate(GameRecord.iter_file(path)):
+				moves = [(record.get_player(ply), square) for ply, square in enumerate(record.moves) if square != GameRecord.PASS]
+				yield {'game' : '%s:%d' % (name, i), 'dimen' : record.dimen, 'bunnies' : record.bunnies, 'moves' : moves}
+			continue
+		if '.jsonl' not in name:
+			continue
+		games = {} # game id : game, for games that have started but not ended
+		with open(path) as f:
+			for line in f:
+				try:
+					record = json.loads(line)
+				except ValueError:
+					continue # partially written line
+				game_id = record.get('game')
+				event = record.get('event')
+				if event == 'game_start':
+					games[game_id] = {'game' : game_id, 'dimen' : record['dimen'], 'bunnies' : record['bunnies'], 'moves' : []}
+				elif event == 'move' and game_id in games:
+					games[game_id]['moves'].append((record['player'], record['square']))
+				elif event == 'game_end' and game_id in games:
+					yield games.pop(game_id)
+		# games cut off by the end of the file
+		for game in games.values():
+			if game['moves']:
+				yield game
+
+
+def get_key(board, player, depth):
+	'''
+	get_key
+		return
+		key of the position for the search cache, the bonuses are left out as they do not change the best move
+	'''
+	return (board.DIMEN, board.owner.tobytes(), bytes(board.bunny), player, depth)
+
+def get_bonus_diff(board, player):
+	return board.player_bonuses[player] - board.player_bonuses[Board.toggle_player(player)]
+
+def search(ai, player, depth):
+	'''
+	search searches the boards position, or takes the result from the shared cache
+		ai : ai of the board to search with
+		player : player to move
+		depth : moves to search ahead
+		return
+		(value, square) value of the board for player and the best square
+	'''
+	key = get_key(ai.board, player, depth)
+	result = _cache.get(key) if _cache is not None else None
+	if result is None:
+		value, square = ai.search(player, depth)
+		# the bonuses so far add the same amount to every line, so cache the value without them
+		result = (value - get_bonus_diff(ai.board, player), square)
+		if _cache is not None:
+			_cache[key] = result
+	return result[0] + get_bonus_diff(ai.board, player), result[1]
+
+def analyze_game(game):
+	'''
+	analyze_game replays a game and annotates each move
+		game : game from read_games
+		return
+		dict of the game id, the annotated moves, the number of positions searched and the search time
+	'''
+	start = time.perf_counter()
+	dimen = game['dimen']
+	board = Board((0, 0), (dimen, dimen), dimen, game['bunnies'])
+	ai = AI(Board.PLAYER_BLACK, board, _depth)
+	annotations = []
+	error = None
+	for ply, (player, square) in enumerate(game['moves']):
+		opponent = Board.toggle_player(player)
+		squares = board.get_legal_squares(player)
+		if square not in squares:
+			error = 'illegal move %d at ply %d' % (square, ply)
+			break
+		best_value, best_square = search(ai, player, _depth)
+		best_bonus = max(board.get_bonus(other, board.get_flips(player, other)) for other in squares)
+		flips = board.apply_move(player, square)
+		bonus = board.get_bonus(square, flips)
+		if square == best_square:
+			value = best_value
+		else:
+			value = -search(ai, opponent, _depth-1)[0]
+		loss = best_value - value
+		annotations.append({
+			'ply' : ply,
+			'player' : player,
+			'square' : square,
+			'best' : best_square,
+			'value' : value,
+			'loss' : loss,
+			'blunder' : loss >= BLUNDER,
+			'bonus' : bonus,
+			'missed_bonus' : best_bonus - bonus,
+		})
+	result = {
+		'game' : game['game'],
+		'dimen' : dimen,
+		'moves' : annotations,
+		'blunders' : sum(1 for annotation in annotations if annotation['blunder']),
+		'missed_bonuses' : sum(1 for annotation in annotations if annotation['missed_bonus'] > 0),
+		'positions' : len(annotations),
+		'time' : time.perf_counter()-start,
+	}
+	if error:
+		result['error'] = error
+	return result
+
+
+def init_worker(cache, depth):
+	global _cache, _depth
+	_cache = cache
+	_depth = depth
+
+def analyze(directory, depth=DEPTH, workers=None, output=sys.stdout):
+	'''
+	analyze analyzes every game in directory across a pool of processes, writing each game as it finishes
+		directory : directory of telemetry files and archives
+		depth : moves to search ahead at each position
+		workers : number of processes, defaults to the number of cpus
+		output : file to write one JSON line per game to
+		return
+		(games, positions, seconds)
+	'''
+	workers = workers or os.cpu_count() or 1
+	games = positions = 0
+	start = time.perf_counter()
+	with multiprocessing.Manager() as manager:
+		cache = manager.dict()
+		with multiprocessing.Pool(workers, init_worker, (cache, depth)) as pool:
+			for result in pool.imap_unordered(analyze_game, read_games(directory)):
+				output.write(json.dumps(result, separators=(',',':'))+'\n')
+				output.flush()
+				games += 1
+				positions += result['positions']
+	return games, positions, time.perf_counter()-start
+
+def main(argv):
+	parser = argparse.ArgumentParser(description='Annotate recorded othello games with the loss of each move.')
+	parser.add_argument('directory', help='directory of telemetry files (OTHELLO_TELEMETRY) and game records (OTHELLO_RECORD)')
+	parser.add_argument('-d', '--depth', type=int, default=DEPTH, help='moves to search ahead (default %(default)s)')
+	parser.add_argument('-j', '--workers', type=int, default=None, help='number of processes (default cpu count)')
+	parser.add_argument('-o', '--output', default=None, help='file to write the annotated games to (default stdout)')
+	args = parser.parse_args(argv)
+	if args.depth < 1:
+		parser.error('depth must be at least 1')
+	workers = args.workers or os.cpu_count() or 1
+	output = open(args.output, 'w') if args.output else sys.stdout
+	try:
+		games, positions, seconds = analyze(args.directory, args.depth, workers, output)
+	finally:
+		if args.output:
+			output.close()
+	rate = positions/seconds if seconds > 0 else 0
+	sys.stderr.write('%d games, %d positions in %.2fs: %.1f positions/s, %.1f positions/s per core\n' % \
+		(games, positions, seconds, rate, rate/workers))
+
+
+if __name__ == '__main__':
+	main(sys.argv[1:])
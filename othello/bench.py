@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+'''
+bench
+	Benchmarks for the othello application. Each benchmark prints its results as it runs.
+	Usage: bench.py [name ...]
+	With no names every benchmark is run.
+		board : time to create a board and the memory held by each board, for each menu size
+		rays : move generation and flips using the Tables rays against the inline bounds checked loops
+		render : main's game loop driven by scripted mouse input with SDL's dummy video driver and no
+			frame cap, for each menu size. Needs no display so it can run on a CI box.
+		exhibition : frame times of an AI against AI exhibition of 16 and 25 boards, headless at 60 fps
+'''
+import os, random, sys, time, tracemalloc
+import pygame
+import othello
+from othello import Board, Exhibition, Menu, ScoreBoard
+
+SIZES = (Menu.SMALL_SIZE, Menu.MED_SIZE, Menu.LARGE_SIZE)
+WINDOW_SIZE = (550, 650) # window size set by othello.main
+BOARD_SIZE = (550, 550)
+OFFSET = (2, 43)
+HINT_POS = (50, 18) # on the Show Hint button
+EXIT_POS = (WINDOW_SIZE[0]-12, 18) # on the Exit button
+GAME_OVER_MENU = 'Menu.draw game over' # timer of the game over menu
+
+
+def bench_board(count=200):
+	'''
+	bench_board measures the time to create a board and the memory held by each board
+		count : number of boards to create for each size
+	'''
+	for dimen in SIZES:
+		Board(OFFSET, BOARD_SIZE, dimen) # warm up
+		start = time.perf_counter()
+		for i in range(0, count):
+			Board(OFFSET, BOARD_SIZE, dimen)
+		create_time = (time.perf_counter()-start)/count
+		tracemalloc.start()
+		before = tracemalloc.get_traced_memory()[0]
+		boards = [Board(OFFSET, BOARD_SIZE, dimen) for i in range(0, count)]
+		held = (tracemalloc.get_traced_memory()[0]-before)/count
+		tracemalloc.stop()
+		del boards
+		print('board %2dx%-2d  create %8.1f us  memory %8.0f bytes' % (dimen, dimen, create_time*1e6, held))
+
+
+def inline_get_moves(board, square):
+	'''
+	inline_get_moves is the move generator from before the Tables, bounds checking every step of every ray
+		return
+		list of empty squares reachable from square
+	'''
+	moves = []
+	owner = board.owner[square]
+	i, j = divmod(square, board.DIMEN)
+	for di in range(-1,2):
+		for dj in range(-1,2):
+			ni, nj = i+di, j+dj
+			if (ni, nj) != (i,j) and ni >= 0 and ni < board.DIMEN and nj >= 0 and nj < board.DIMEN:
+				neighbor = board.owner[ni*board.DIMEN+nj]
+				if neighbor != Board.PLAYER_NEITHER and neighbor != owner:
+					while True:
+						ni, nj = ni+di, nj+dj
+						if ni < 0 or ni >= board.DIMEN or nj < 0 or nj >= board.DIMEN:
+							break
+						next_owner = board.owner[ni*board.DIMEN+nj]
+						if next_owner == Board.PLAYER_NEITHER:
+							moves.append(ni*board.DIMEN+nj)
+							break
+						elif next_owner == owner:
+							break
+	return moves
+
+def inline_get_flips(board, player, square):
+	'''
+	inline_get_flips is the flip search from before the Tables, bounds checking every step of every ray
+		return
+		list of squares flipped by player dropping a piece on square
+	'''
+	flips = []
+	if board.owner[square] != Board.PLAYER_NEITHER:
+		return flips
+	opponent = Board.toggle_player(player)
+	i, j = divmod(square, board.DIMEN)
+	for di, dj in Board.DIRECTIONS:
+		run = []
+		ni, nj = i+di, j+dj
+		while ni >= 0 and ni < board.DIMEN and nj >= 0 and nj < board.DIMEN \
+				and board.owner[ni*board.DIMEN+nj] == opponent:
+			run.append(ni*board.DIMEN+nj)
+			ni, nj = ni+di, nj+dj
+		if run and ni >= 0 and ni < board.DIMEN and nj >= 0 and nj < board.DIMEN \
+				and board.owner[ni*board.DIMEN+nj] == player:
+			flips.extend(run)
+	return flips
+
+def get_positions(dimen, games, seed=0):
+	'''
+	get_positions plays random games
+		dimen : dimension of the grid
+		games : number of games to play
+		seed : seed of the random moves and bunnies
+		return
+		list of (board, player to move) for every position reached
+	'''
+	rng = random.Random(seed)
+	positions = []
+	for game in range(0, games):
+		bunnies = [rng.randrange(dimen*dimen) for i in range(0, Board.BUNNIES)]
+		board = Board(OFFSET, BOARD_SIZE, dimen, bunnies)
+		player = Board.PLAYER_BLACK
+		passes = 0
+		while passes < 2:
+			positions.append((board.copy(), player))
+			squares = board.get_legal_squares(player)
+			if squares:
+				board.apply_move(player, rng.choice(squares))
+				passes = 0
+			else:
+				passes += 1
+			player = Board.toggle_player(player)
+	return positions
+
+def bench_rays(games=20, repeat=3):
+	'''
+	bench_rays measures the move generator and flip search with the Tables rays against the inline loops
+		games : number of random games to take positions from
+		repeat : number of times each position is searched
+	'''
+	def timed(func):
+		start = time.perf_counter()
+		for i in range(0, repeat):
+			func()
+		return (time.perf_counter()-start)/repeat
+
+	for dimen in SIZES:
+		positions = get_positions(dimen, games)
+		squares = range(0, dimen*dimen)
+
+		def table_moves():
+			for board, player in positions:
+				for square in board.iter_squares(board.pieces[player]):
+					board.get_moves(board.Cell(board, square))
+		def inline_moves():
+			for board, player in positions:
+				for square in board.iter_squares(board.pieces[player]):
+					inline_get_moves(board, square)
+		def table_flips():
+			for board, player in positions:
+				for square in squares:
+					board.get_flips(player, square)
+		def inline_flips():
+			for board, player in positions:
+				for square in squares:
+					inline_get_flips(board, player, square)
+
+		for name, table, inline in (('moves', table_moves, inline_moves), ('flips', table_flips, inline_flips)):
+			table_time, inline_time = timed(table), timed(inline)
+			print('rays %2dx%-2d %s  tables %8.2f ms  inline %8.2f ms  speedup %.2fx (%d positions)' % \
+				(dimen, dimen, name, table_time*1e3, inline_time*1e3, inline_time/table_time, len(positions)))
+
+
+class ScriptedInput:
+	'''
+	ScriptedInput is a fixed sequence of events, one list per frame, that stands in for pygame.event.get.
+	It selects a board size and starts a 2-PLAYER game, and plays legal moves picked by a seeded shadow Board,
+	showing a hint and then clicking a piece and the square to move it to for every move. A few moves in it
+	exits to the menu and starts again, then plays that game to the end and clicks RETRY, plays the next game to
+	the end and clicks REPLAY, steps through the replay and exits before quitting. The time between calls is
+	the frame time.
+	'''
+	MOVES_BEFORE_EXIT = 4 # moves of the first game before exiting to the menu
+	def __init__(self, size_id, seed=0):
+		'''
+			size_id : menu size button to select
+			seed : seed of the moves
+		'''
+		menu = Menu((WINDOW_SIZE[0]//2, WINDOW_SIZE[1]//2))
+		self.dimen = {'S' : Menu.SMALL_SIZE, 'M' : Menu.MED_SIZE, 'L' : Menu.LARGE_SIZE}[size_id]
+		self.rng = random.Random(seed)
+		self.script = []
+		self.click(self.get_button_pos(menu, size_id), 2)
+		self.click(self.get_button_pos(menu, '2-PLAYER'), 2)
+		self.play(self.MOVES_BEFORE_EXIT)
+		self.click(EXIT_POS, 2)
+		self.click(self.get_button_pos(menu, '2-PLAYER'), 2)
+		self.play()
+		self.click(self.get_button_pos(menu, 'RETRY'), 2)
+		self.play()
+		self.click(self.get_button_pos(menu, 'REPLAY'), 2)
+		for key in (pygame.K_HOME, pygame.K_RIGHT, pygame.K_RIGHT, pygame.K_END, pygame.K_LEFT):
+			self.key(key, 1)
+		self.click(EXIT_POS, 2)
+		self.script.append([pygame.event.Event(pygame.QUIT)])
+		self.frame = 0
+		self.last = None
+		self.frame_times = []
+
+	def play(self, moves=None):
+		'''
+		play adds the frames of a new game, following it on a shadow board so every click is a legal move
+			moves : number of moves to make, or None to play until the game is over
+		'''
+		board = Board(OFFSET, BOARD_SIZE, self.dimen, []) # bunnies do not change the moves
+		player = Board.PLAYER_BLACK
+		while moves is None or moves > 0:
+			squares = board.get_legal_squares(player)
+			if not squares:
+				if not board.get_legal_squares(Board.toggle_player(player)):
+					break # game over
+				self.script.append([]) # main passes the turn on a frame of its own
+				player = Board.toggle_player(player)
+				continue
+			square = self.rng.choice(squares)
+			# the move is made by picking up a piece it can be reached from
+			cell_to = board.Cell(board, square)
+			cell_from = next(cell for cell in board.get_owned_cells(player) if cell_to in board.get_moves(cell))
+			self.click(HINT_POS, 0)
+			self.click(cell_from.midpoint, 0)
+			# clicks are ignored while the move is animating
+			self.click(cell_to.midpoint, Board.WAIT_TIME+1)
+			board.apply_move(player, square)
+			player = Board.toggle_player(player)
+			if moves is not None:
+				moves -= 1
+		self.script.append([]) # the game over menu is shown the frame after the game ends
+
+	@staticmethod
+	def get_button_pos(menu, label):
+		x, y, w, h = menu.buttons[label].rect
+		return int(x+w/2), int(y+h/2)
+
+	def click(self, pos, idle):
+		'''
+		click adds a frame with a left click at pos followed by idle frames without events
+		'''
+		self.script.append([pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)])
+		for i in range(0, idle):
+			self.script.append([])
+
+	def key(self, key, idle):
+		'''
+		key adds a frame with a key press followed by idle frames without events
+		'''
+		self.script.append([pygame.event.Event(pygame.KEYDOWN, key=key)])
+		for i in range(0, idle):
+			self.script.append([])
+
+	def get_events(self):
+		now = time.perf_counter()
+		if self.last is not None:
+			self.frame_times.append(now-self.last)
+		self.last = now
+		pygame.event.pump()
+		events = self.script[min(self.frame, len(self.script)-1)]
+		self.frame += 1
+		return events
+
+
+def bench_render(seed=0):
+	'''
+	bench_render runs main's game loop headless with scripted input and no frame cap, reporting the
+	frame rate, the p50 and p99 frame time and the time spent in each draw method
+		seed : seed of the bunnies and the scripted moves
+	'''
+	os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+	os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+	pygame.init()
+	draws = {'Board.draw' : (Board, 'draw'), 'ScoreBoard.draw' : (ScoreBoard, 'draw'), 'Menu.draw' : (Menu, 'draw')}
+	timer_names = list(draws.keys())+[GAME_OVER_MENU]
+	timers = {}
+
+	def timed(name, draw):
+		def wrapper(*args, **kwargs):
+			key = name
+			# the game over menu is drawn by menu.draw(screen, True, hover)
+			if name == 'Menu.draw' and (args[2:3] == (True,) or kwargs.get('game_over')):
+				key = GAME_OVER_MENU
+			start = time.perf_counter()
+			try:
+				return draw(*args, **kwargs)
+			finally:
+				timers[key][0] += time.perf_counter()-start
+				timers[key][1] += 1
+		return wrapper
+
+	originals = {name : getattr(cls, attr) for name, (cls, attr) in draws.items()}
+	for name, (cls, attr) in draws.items():
+		setattr(cls, attr, timed(name, originals[name]))
+	try:
+		for size_id in ('S', 'M', 'L'):
+			for name in timer_names:
+				timers[name] = [0.0, 0]
+			random.seed(seed)
+			script = ScriptedInput(size_id, seed)
+			start = time.perf_counter()
+			othello.main(events=script.get_events, fps=0)
+			elapsed = time.perf_counter()-start
+			frame_times = sorted(script.frame_times)
+			p50 = frame_times[int(0.50*(len(frame_times)-1))]
+			p99 = frame_times[int(0.99*(len(frame_times)-1))]
+			print('render %s  %4d frames  %7.1f fps  p50 %6.2f ms  p99 %6.2f ms' % \
+				(size_id, len(frame_times), len(frame_times)/elapsed, p50*1e3, p99*1e3))
+			for name in timer_names:
+				total, calls = timers[name]
+				print('    %-22s %8.1f ms total  %6.3f ms per call  %5d calls' % \
+					(name, total*1e3, total/calls*1e3 if calls else 0, calls))
+			if timers[GAME_OVER_MENU][1] == 0:
+				raise RuntimeError('render %s: the scripted games never reached game over' % size_id)
+	finally:
+		for name, (cls, attr) in draws.items():
+			setattr(cls, attr, originals[name])
+
+
+def bench_exhibition(frames=600, counts=(16, 25)):
+	'''
+	bench_exhibition runs AI against AI exhibitions headless capped at 60 fps, reporting the frame rate,
+	the p50 and p99 frame time and the number of AI moves made
+		frames : frames to run each exhibition for
+		counts : numbers of boards to run
+	'''
+	os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+	os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+	for count in counts:
+		frame_times = []
+		last = [None]
+		def events():
+			now = time.perf_counter()
+			if last[0] is not None:
+				frame_times.append(now-last[0])
+			last[0] = now
+			pygame.event.pump()
+			if len(frame_times) >= frames:
+				return [pygame.event.Event(pygame.QUIT)]
+			return []
+		exhibition = Exhibition(count)
+		start = time.perf_counter()
+		exhibition.run(events, fps=60)
+		elapsed = time.perf_counter()-start
+		frame_times.sort()
+		p50 = frame_times[int(0.50*(len(frame_times)-1))]
+		p99 = frame_times[int(0.99*(len(frame_times)-1))]
+		print('exhibition %2d boards  %4d frames  %7.1f fps  p50 %6.2f ms  p99 %6.2f ms  %d moves' % \
+			(count, len(frame_times), len(frame_times)/elapsed, p50*1e3, p99*1e3, exhibition.searches))
+
+
+BENCHMARKS = {
+	'board' : bench_board,
+	'rays' : bench_rays,
+	'render' : bench_render,
+	'exhibition' : bench_exhibition,
+}
+
+def main(names):
+	for name in names or list(BENCHMARKS.keys()):
+		BENCHMARKS[name]()
+
+
+if __name__ == '__main__':
+	main(sys.argv[1:])
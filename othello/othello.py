@@ -4,22 +4,118 @@ othello
 	This is a Pygame application to play Othello against an AI. The GUI is hopwfully straightforward enough
 	for any new player to learn how to use it.
 	The application consits of a Board, AI, Menu, ScoreBoard and Main. 
+	The Assets is a process wide cache of the images and fonts used by the rest of the application.
 	The Board consists of cells which represent the spaces on the grid where pieces and bunnies are placed.
 	The board is used to make moves, get avaiable moves and draw the board state.
+	The Tables are lookup tables of rays, neighbors and square kinds built once for each board dimension.
 	The AI is a random move  picker which makes use of the Board class to find an available move.
 	The Menu is a collection of buttons that are displayed at the end and start of a game.
 	The Scoreboard is a class that is used to draw each players score and a small icon to show the current player.
+	The Telemetry is an opt in log of game events and AI think times, written as JSON lines.
+	The GameRecord is a compact record of a game with keyframes, which the Replay draws at any move.
+	The Exhibition plays many Matches at once in one window, with the AI moves searched on a pool of processes.
 	Main is the main game loop and performs all input handling, and game state logic.
 '''
-import datetime
+import argparse, array, collections, concurrent.futures, json, os, queue, struct, threading, uuid
 import pygame,math,random, time
 
 
+	# ---------------------------- Assets Class ------------------------------------
+class Assets:
+	'''
+	Assets - Process wide cache of images and fonts.
+			Each image is loaded from disk once, with paths resolved relative to this module rather than
+			the current working directory. Scaled variants are cached per size and the least recently used
+			variant is evicted once more than MAX_SCALED are held.
+	'''
+	DIR = os.path.dirname(os.path.abspath(__file__))
+	MAX_SCALED = 16 # scaled surfaces kept before evicting
+	_lock = threading.RLock()
+	_images = {} # name : surface
+	_scaled = collections.OrderedDict() # (name, size) : surface, in least recently used order
+	_fonts = {} # size : font
+
+	@classmethod
+	def path(cls, name):
+		'''
+		path returns the absolute path of an asset
+			name : file name relative to this module
+		'''
+		return os.path.join(cls.DIR, name)
+
+	@classmethod
+	def image(cls, name):
+		'''
+		image returns the unscaled image, loading it on first use
+			name : file name relative to this module
+		'''
+		with cls._lock:
+			img = cls._images.get(name)
+			if img is None:
+				img = pygame.image.load(cls.path(name))
+				cls._images[name] = img
+			return img
+
+	@classmethod
+	def scaled(cls, name, size):
+		'''
+		scaled returns the image scaled to size, scaling it on first use
+			name : file name relative to this module
+			size : (width, height) of the scaled image
+		'''
+		key = (name, tuple(size))
+		with cls._lock:
+			img = cls._scaled.get(key)
+			if img is not None:
+				cls._scaled.move_to_end(key)
+				return img
+			img = pygame.transform.scale(cls.image(name), key[1])
+			cls._scaled[key] = img
+			# evict least recently used
+			while len(cls._scaled) > cls.MAX_SCALED:
+				cls._scaled.popitem(last=False)
+			return img
+
+	@classmethod
+	def font(cls, size):
+		'''
+		font returns the default system font at the given size
+			size : font height
+		'''
+		with cls._lock:
+			font = cls._fonts.get(size)
+			if font is None:
+				font = pygame.font.SysFont(None, size)
+				cls._fonts[size] = font
+			return font
+
+	@classmethod
+	def preload(cls, name, sizes, font_sizes=()):
+		'''
+		preload loads and scales the image for each size on a background thread
+			name : file name relative to this module
+			sizes : list of (width, height) to scale the image to
+			font_sizes : list of font heights to load
+			return
+				the preload thread
+		'''
+		def load():
+			for font_size in font_sizes:
+				cls.font(font_size)
+			for size in sizes:
+				cls.scaled(name, size)
+		thread = threading.Thread(target=load, name='asset-preload', daemon=True)
+		thread.start()
+		return thread
+
+
 	# ---------------------------- Board Class ------------------------------------
 class Board:
 	'''
 	Board - Represents the Othello/Reversi board as a 2D grid of cells.
-			Each cell is owned by either player one, two, or neither(nil). 
+			Each cell is owned by either player one, two, or neither(nil).
+			The cell state is stored in flat arrays indexed by square number (i*DIMEN+j), and each
+			players pieces are kept as a bitset with one bit per square.
 	'''
 	# Statics for the board
 	PLAYER_NEITHER = -1 # niether player
@@ -31,55 +127,89 @@ class Board:
 
 	TILE_COLOR_A = [34,109,34]
 	TILE_COLOR_B = [12,155,12]
-	
+	FONT_SIZE = 48
+
 	# Move and states
 	TIE = 2 		# TIE
-	NO_MOVES = 3	
+	NO_MOVES = 3
 	GAME_OVER = 4
 	WAIT_TIME = 8 # 5 steps
 	BUNNY_FILE = 'bunny.png'
+	BUNNIES = 5 # number of bunnies placed on a new board
+	# (di, dj) of the 8 neighbors of a cell
+	DIRECTIONS = [(di, dj) for di in range(-1,2) for dj in range(-1,2) if (di, dj) != (0, 0)]
 
 	# ---------------------------- Cell Class ------------------------------------
 	class Cell:
 		'''
-		Board - Basic components of the board
-				Each cell has an owner that is either one of the players or none. 
+		Cell - View of a single square of the board
+				Cells are created on demand and hold only the board and the square number, all of the
+				state is read from and written to the boards arrays.
+				Each cell has an owner that is either one of the players or none.
 				Each cell also contains its indices on the grid [0-DIMEN][0-DIMEN] and its
 				position in screen space (x,y).
 		'''
+		__slots__ = ('board', 'index')
 		# Statics for the cells
 		HIGHLIGHT_PIECE_COLOR= [255,12,0]
 		HIGHLIGHT_CELL_COLOR = [250,250,0]
+		HOVER_COLOR = [255,255,255]
 		TEXT_COLOR = [205,5,1]
 		BONUS = 2
-		FRAMES = 5 # number animation frames 
+		FRAMES = 5 # number animation frames
+		FONT_SIZE = 54
 		# ---------------------------- Cell Definitions ------------------------------------
-		def __init__(self, grid_pos, screen_pos, size, owner):
-			i,j = grid_pos[0],grid_pos[1]
-			x,y = screen_pos[0],screen_pos[1]
-			self.grid_pos = grid_pos # indices on grid
-			self.screen_pos = screen_pos # coordinates of rect
-			self.size = size  # size of cell
-			self.owner = owner # player one, two or nil
-			self.midpoint = int((x*2+size[0])/2), int((y*2+size[1])/2) # get middle of rect diagonal
-			self.radius = int((size[0]+size[1])/5) # create radius slightly smaller than avg of width and height
-			self.rect = [self.screen_pos[0],self.screen_pos[1],self.size[0],self.size[1]]
-			self.frame = 0
-			# color each cell in traditional "grid" pattern
-			# if col is even and row is odd  
-			if (i%2) == 0 and (j%2) != 0:
-					self.cell_color = Board.TILE_COLOR_A
-			# if row is even and col is odd 
-			elif (j%2) == 0 and (i%2) != 0:
-					self.cell_color = Board.TILE_COLOR_A
-			else:
-				#else color background color
-				self.cell_color = Board.TILE_COLOR_B
-			self.bunny = None
-			self.plus_one_frame = False # if bonus
-			self.font = pygame.font.SysFont(None, 54)
-			self.plus_one_text = self.font.render('+'+str(self.BONUS), True,  self.TEXT_COLOR)
+		def __init__(self, board, index):
+			self.board = board # board the cell views
+			self.index = index # square number on the board
+
+		@property
+		def grid_pos(self):
+			return divmod(self.index, self.board.DIMEN) # indices on grid
 
+		@property
+		def owner(self):
+			return self.board.owner[self.index] # player one, two or nil
+
+		@owner.setter
+		def owner(self, player):
+			self.board.set_owner(self.index, player)
+
+		@property
+		def bunny(self):
+			return self.board.bunny[self.index] != 0
+
+		@property
+		def frame(self):
+			return self.board.frame[self.index]
+
+		@property
+		def plus_one_frame(self):
+			return self.board.bonus_frame[self.index]
+
+		@plus_one_frame.setter
+		def plus_one_frame(self, frame):
+			self.board.bonus_frame[self.index] = frame
+
+		@property
+		def rect(self):
+			return self.board.get_rect(self.index)
+
+		@property
+		def screen_pos(self):
+			return tuple(self.rect[:2]) # coordinates of rect
+
+		@property
+		def size(self):
+			return self.board.cell_size # size of cell
+
+		@property
+		def midpoint(self):
+			return self.board.get_midpoint(self.index)
+
+		@property
+		def radius(self):
+			return self.board.radius
 
 		def __repr__(self):
 			'''
@@ -92,21 +222,21 @@ class Board:
 				used to allow for cell equivalence checks
 			'''
 			if other:
-				return self.grid_pos == other.grid_pos		
+				return self.index == other.index
 			return False
 
 		def __hash__(self):
 			'''
 				used to allow for cells to be used as dict keys
 			'''
-			return hash(self.grid_pos )
+			return hash(self.index)
 
 
 		def copy(self):
 			'''
-				return deepcopy of cell
+				return copy of the cell view
 			'''
-			return Board.Cell(self.grid_pos, self.screen_pos, self.size, self.owner)
+			return Board.Cell(self.board, self.index)
 
 
 		def draw(self, screen):
@@ -114,62 +244,10 @@ class Board:
 				draw the given cell on the screen
 				screen : screen to draw on
 			'''
-			pygame.draw.rect(screen, self.cell_color, self.rect, 0)
-			# draw the piece if any
-			if self.owner != Board.PLAYER_NEITHER:
-				color = None
-				if self.frame == 0: # not currently animated
-					if self.owner == Board.PLAYER_BLACK:
-						color = Board.BLACK
-					elif self.owner == Board.PLAYER_WHITE:
-						color = Board.WHITE
-					pygame.draw.circle(screen, color, self.midpoint,self.radius,0)
-				else: #animate
-					# to simulate the piece being flipped draw an ellipse whose width decrease then increases
-					# on the increase change the color to the new owner 
-					# flips along
-					if self.bunny:
-						self.plus_one_frame = 1
-					rot = math.sin(self.frame)
-					if rot < 0:
-						rot *= -1
-						# flip color to current owner
-						if self.owner == Board.PLAYER_BLACK:
-							color = Board.BLACK
-						elif self.owner == Board.PLAYER_WHITE:
-							color = Board.WHITE
-					else:
-						# still flipping, draw with previous owner color
-						if self.owner == Board.PLAYER_BLACK:
-							color = Board.WHITE
-						elif self.owner == Board.PLAYER_WHITE:
-							color = Board.BLACK
-					# draw animated rotating disk effect with ellipse
-					w,h = self.radius*2/self.frame*rot, self.radius*2
-					x,y = self.midpoint[0]-self.radius/self.frame*rot, self.midpoint[1]-self.radius
-					pygame.draw.ellipse(screen, color, [x,y,w,h],0)
-					self.frame += 1
-					self.frame %= self.FRAMES
-
-			
-			if self.bunny != None:
-				pos =  int(self.midpoint[0]-self.bunny.get_width()/2),\
-				  		int(self.midpoint[1]-self.bunny.get_height()/2)
-				screen.blit(self.bunny, pos)
-				if self.plus_one_frame > 0:
-					x,y = self.rect[0], self.rect[1]
-					w,h = self.rect[2]+self.frame*2, self.rect[3]+self.frame*2
-					screen.blit(self.plus_one_text, [x,y,w,h])
-					if self.plus_one_frame == 0:
-						self.plus_one_frame = False
-					else:
-						self.plus_one_frame += 1
-						self.plus_one_frame %= self.FRAMES
+			self.board.draw_square(screen, self.index)
 
 		def flip(self):
-			self.frame = 1
-			# flip owner
-			self.owner = Board.toggle_player(self.owner)
+			self.board.flip_square(self.index)
 
 
 		def draw_highlight(self,screen, piece=False):
@@ -179,27 +257,40 @@ class Board:
 				pygame.draw.rect(screen, self.HIGHLIGHT_CELL_COLOR, self.rect, 3)
 
 
-		def does_intersect(self, pos):
-			return (pos[0] > self.rect[0] and pos[0] < self.rect[0]+self.rect[2]) \
-				and (pos[1] > self.rect[1] and pos[1] < self.rect[1]+self.rect[3])
-			
+		def draw_hover(self, screen):
+			pygame.draw.rect(screen, self.HOVER_COLOR, self.rect, 1)
+
+
 	# ---------------------------- Board Definitions ------------------------------------
-	def __init__(self, offset, size):
-		self.font = pygame.font.SysFont(None, 48)
+	def __init__(self, offset, size, dimen=None, bunnies=None):
+		'''
+			offset : position in screen space to start drawing
+			size : size of the board in screen space
+			dimen : dimension of the grid, defaults to Board.DIMEN
+			bunnies : squares to place bunnies on, defaults to random squares
+		'''
+		self.DIMEN = dimen or Board.DIMEN # fix the dimension for this board
 		self.offset = offset
-		self.size = size 
-		cell_size = size[0]//self.DIMEN, size[1]//self.DIMEN
-		img_size = int(cell_size[0]*0.6), int(cell_size[1]*0.6)
-		self.img = pygame.transform.scale(pygame.image.load(self.BUNNY_FILE), img_size)
-		self.player_bonuses = {} 
-		self.grid = []
-		self.setup_board(offset, cell_size)
-		# TODO - random ", draw as bunny 
+		self.size = size
+		self.cell_size = size[0]//self.DIMEN, size[1]//self.DIMEN
+		# create radius slightly smaller than avg of width and height
+		self.radius = int((self.cell_size[0]+self.cell_size[1])/5)
+		self.bunny_size = self.get_bunny_size(size, self.DIMEN)
+		self.tables = Tables.get(self.DIMEN) # rays, neighbors and square kinds shared by boards of this size
+		self.img = None # bunny image, fetched on first draw
+		self.plus_one_text = None # bonus text, rendered on first draw
+		squares = self.DIMEN*self.DIMEN
+		self.owner = array.array('b', [self.PLAYER_NEITHER])*squares # player one, two or nil
+		self.bunny = bytearray(squares) # 1 if square has a bunny
+		self.frame = bytearray(squares) # flip animation frame, 0 if not animated
+		self.bonus_frame = bytearray(squares) # bonus text animation frame, 0 if not shown
+		self.changed = set() # squares to redraw on the next draw_changed
+		self.setup_board()
 		# assign "bunnies" double point cells
-		random.seed(datetime.datetime.now())
-		for i in range(0,5):
-			x,y =  random.randint(0,self.DIMEN-1), random.randint(0, self.DIMEN-1) 
-			self.grid[x][y].bunny = self.img
+		if bunnies is None:
+			bunnies = [random.randint(0, squares-1) for i in range(0, self.BUNNIES)]
+		for square in bunnies:
+			self.bunny[square] = 1
 		self.winner = self.PLAYER_NEITHER
 		# foreach bunny visited add to bonus
 		self.wait = 0 #animation waittime, after eah move made wait for animation
@@ -209,62 +300,137 @@ class Board:
 			copy creates a copy of board state
 			return deepcopy of board
 		'''
-		copy = Board(self.offset, self.size)
-		for i in range(0,self.DIMEN):
-			for j in range(0,self.DIMEN):
-				copy.grid[i][j] = self.grid[i][j].copy()
+		copy = Board(self.offset, self.size, self.DIMEN, self.get_bunnies())
+		copy.owner = array.array('b', self.owner)
+		copy.pieces = dict(self.pieces)
+		copy.player_bonuses = dict(self.player_bonuses)
 		return copy
 
 	def is_waiting(self):
 		'''
 			is_waiting is used  to help tell if board is waiting for animations to finish
-			return 
-				true if wait var is not zero 
+			return
+				true if wait var is not zero
 		'''
 		return self.wait > 0
 
 
+	@staticmethod
+	def get_bunny_size(size, dimen):
+		'''
+		get_bunny_size
+			size : size of the board in screen space
+			dimen : dimension of the grid
+			return
+			size of the bunny image drawn in each cell
+		'''
+		cell_size = size[0]//dimen, size[1]//dimen
+		return int(cell_size[0]*0.6), int(cell_size[1]*0.6)
+
 	@staticmethod
 	def toggle_player(player):
 		'''
 		toggle_player
-			return 
+			return
 			next player
 		'''
 		return (player+1)%2
 
+	@staticmethod
+	def iter_squares(bits):
+		'''
+		iter_squares
+			bits : bitset of squares
+			return
+			generator of the square numbers set in bits, lowest first
+		'''
+		while bits:
+			low = bits & -bits
+			yield low.bit_length()-1
+			bits ^= low
+
 
-	def setup_board(self, offset, cell_size):
+	def setup_board(self):
 		'''
 		setup_board
 		 sets up grid for a new game
-		 offset: position in screen space to start drawing
-		 cell_size : size for each cell in the grid
 		'''
 		# bonuses for each player
 		self.player_bonuses = {self.PLAYER_BLACK : 0, self.PLAYER_WHITE : 0}
-		self.pieces = {}
-		# clear if not empty
-		if len(self.grid) > 0:	
-			for row in self.grid:
-				row[:] = []
-			self.grid[:] = []
-		# populate elements
-		for x in range(0, self.DIMEN):
-			self.grid.append([])
-			for y in range(0, self.DIMEN):
-				screen_pos = (offset[0]+x*cell_size[0], offset[1]+y*cell_size[1])
-				self.grid[x].append(self.Cell((x,y), screen_pos, cell_size, self.PLAYER_NEITHER) )
+		# bitset of owned squares for each player
+		self.pieces = {self.PLAYER_BLACK : 0, self.PLAYER_WHITE : 0}
+		for square in range(0, len(self.owner)):
+			self.owner[square] = self.PLAYER_NEITHER
 		center = (self.DIMEN-1)//2
 		# set initial pieces
-		a = self.grid[center][center+1]
-		b = self.grid[center+1][center]
-		c = self.grid[center][center]
-		d = self.grid[center+1][center+1]
-		self.pieces[self.PLAYER_BLACK] = {a:1, b:1}
-		self.pieces[self.PLAYER_WHITE] = {c:1, d:1}
-		a.owner = b.owner = self.PLAYER_BLACK
-		c.owner = d.owner = self.PLAYER_WHITE
+		self.set_owner(self.get_square(center, center+1), self.PLAYER_BLACK)
+		self.set_owner(self.get_square(center+1, center), self.PLAYER_BLACK)
+		self.set_owner(self.get_square(center, center), self.PLAYER_WHITE)
+		self.set_owner(self.get_square(center+1, center+1), self.PLAYER_WHITE)
+
+	def get_square(self, i, j):
+		'''
+		get_square
+			i, j : indices on the grid
+			return
+			square number of the indices
+		'''
+		return i*self.DIMEN+j
+
+	def get_cell(self, i, j):
+		'''
+		get_cell
+			i, j : indices on the grid
+			return
+			cell view of the square
+		'''
+		return self.Cell(self, self.get_square(i, j))
+
+	def get_bunnies(self):
+		'''
+		get_bunnies
+			return
+			list of squares with a bunny
+		'''
+		return [square for square in range(0, len(self.bunny)) if self.bunny[square]]
+
+	def load_position(self, owner, bonuses):
+		'''
+		load_position replaces the position on the board
+			owner : owner of each square
+			bonuses : (black bonus, white bonus)
+		'''
+		self.owner = array.array('b', owner)
+		self.pieces = {self.PLAYER_BLACK : 0, self.PLAYER_WHITE : 0}
+		for square in range(0, len(self.owner)):
+			if self.owner[square] != self.PLAYER_NEITHER:
+				self.pieces[self.owner[square]] |= 1 << square
+		self.player_bonuses = {self.PLAYER_BLACK : bonuses[0], self.PLAYER_WHITE : bonuses[1]}
+		self.invalidate()
+
+	def set_owner(self, square, player):
+		'''
+		set_owner sets the owner of the square and updates each players pieces
+			square : square number
+			player : new owner
+		'''
+		bit = 1 << square
+		owner = self.owner[square]
+		if owner != self.PLAYER_NEITHER:
+			self.pieces[owner] &= ~bit
+		if player != self.PLAYER_NEITHER:
+			self.pieces[player] |= bit
+		self.owner[square] = player
+		self.changed.add(square)
+
+	def flip_square(self, square):
+		'''
+		flip_square flips the owner of the square and starts its animation
+			square : square number
+		'''
+		self.frame[square] = 1
+		# flip owner
+		self.set_owner(square, self.toggle_player(self.owner[square]))
 
 	def get_winner(self):
 		'''
@@ -278,31 +444,22 @@ class Board:
 		'''
 		get_score returns players score (number of owned cells plus any bonuses)
 			player : player to get score for
-			return 
+			return
 				players score
 		'''
-		score = 0
-		for cell in self.pieces[player]:
-			score+=1
+		score = bin(self.pieces[player]).count('1')
 		return score + self.player_bonuses[player]
 
 	def check_game_over(self):
 		'''
-			check_game_over gets games winner, else returns neither meaning game has not ended 
+			check_game_over gets games winner, else returns neither meaning game has not ended
 			return
 			winner if game is over, if game is not over returns PLAYER_NEITHER
 		'''
 		winner = self.PLAYER_NEITHER
-		has_empty = False
-		i = 0
 		# try to find any empty cell
-		while not has_empty and i < self.DIMEN:
-			j =0
-			while not has_empty and j < self.DIMEN:
-				if self.grid[i][j].owner == self.PLAYER_NEITHER:
-					has_empty = True
-				j+=1
-			i+=1
+		full = (1 << len(self.owner))-1
+		has_empty = (self.pieces[self.PLAYER_BLACK] | self.pieces[self.PLAYER_WHITE]) != full
 
 		black_score = self.get_score(self.PLAYER_BLACK)
 		white_score = self.get_score(self.PLAYER_WHITE)
@@ -314,21 +471,21 @@ class Board:
 		elif not has_empty:
 			print("FULL BOARD!")
 			if black_score > white_score:
-				winner = self.PLAYER_BLACK  
+				winner = self.PLAYER_BLACK
 			elif black_score < white_score:
 				winner = self.PLAYER_WHITE
 			else:
 				winner = self.TIE
 		# if both players have no moves then TIE
-		else: 
-			black_moves =  self.get_all_moves(self.PLAYER_BLACK)
-			white_moves = self.get_all_moves(self.PLAYER_WHITE)
-			if black_moves == False and white_moves == False:
-				winner = self.TIE  
+		else:
+			black_moves =  self.get_legal_squares(self.PLAYER_BLACK)
+			white_moves = self.get_legal_squares(self.PLAYER_WHITE)
+			if not black_moves and not white_moves:
+				winner = self.TIE
 
 		self.winner = winner
 		return self.winner != self.PLAYER_NEITHER
-		
+
 	def get_all_moves(self, player):
 		'''
 		get_all_moves gets all available moves for a player
@@ -337,7 +494,7 @@ class Board:
 			 false if player has no moves else returns list of all moves (cell_from, cell_to)
 		'''
 		moves = False
-		move = Board.NO_MOVES 
+		move = Board.NO_MOVES
 		# for each cell try to find a move to pick
 		for cell_from in self.get_owned_cells(player):
 			for  cell_to in self.get_moves(cell_from):
@@ -348,29 +505,157 @@ class Board:
 
 	def draw(self, screen):
 		'''
-		draw get all cells 
+		draw get all cells
 			screen: screen to draw on
 		'''
+		self.invalidate()
+		self.draw_changed(screen)
+
+	def invalidate(self):
+		'''
+		invalidate marks every square to be redrawn
+		'''
+		self.changed.update(range(0, len(self.owner)))
+
+	def draw_changed(self, screen):
+		'''
+		draw_changed draws only the squares that changed or are animating since the last draw
+			screen: screen to draw on
+			return
+				list of rects drawn
+		'''
 		self.wait-= 1
 		if self.wait < 0:
 			self.wait = 0
-		for row in self.grid:
-			for cell in row:
-				cell.draw(screen)
+		if self.img is None:
+			self.img = Assets.scaled(self.BUNNY_FILE, self.bunny_size)
+			font = Assets.font(min(self.Cell.FONT_SIZE, self.cell_size[1]))
+			self.plus_one_text = font.render('+'+str(self.Cell.BONUS), True, self.Cell.TEXT_COLOR)
+		squares = sorted(self.changed)
+		self.changed = set()
+		rects = []
+		# keep the bonus text inside the board
+		clip = screen.get_clip()
+		screen.set_clip([self.offset[0], self.offset[1], self.cell_size[0]*self.DIMEN, self.cell_size[1]*self.DIMEN])
+		for square in squares:
+			bonus_shown = self.bonus_frame[square] > 0
+			animated = self.frame[square] > 0 or bonus_shown
+			self.draw_square(screen, square)
+			rects.append(self.get_rect(square))
+			# keep drawing while animated, and once more after to draw the last frame
+			if animated:
+				self.changed.add(square)
+			# bonus text spills over the neighbors
+			if bonus_shown:
+				self.changed.update(self.tables.neighbors[square])
+		screen.set_clip(clip)
+		return rects
+
+	def get_rect(self, square):
+		'''
+		get_rect
+			square : square number
+			return
+			rect of the square in screen space
+		'''
+		i, j = divmod(square, self.DIMEN)
+		w, h = self.cell_size
+		return [self.offset[0]+i*w, self.offset[1]+j*h, w, h]
+
+	def get_midpoint(self, square):
+		'''
+		get_midpoint
+			square : square number
+			return
+			middle of the squares rect diagonal
+		'''
+		x, y, w, h = self.get_rect(square)
+		return int((x*2+w)/2), int((y*2+h)/2)
 
+	def draw_square(self, screen, square):
+		'''
+			draw_square draws the given square on the screen
+			screen : screen to draw on
+			square : square number
+		'''
+		i, j = divmod(square, self.DIMEN)
+		rect = self.get_rect(square)
+		midpoint = self.get_midpoint(square)
+		radius = self.radius
+		owner = self.owner[square]
+		frame = self.frame[square]
+		# color each cell in traditional "grid" pattern
+		# if exactly one of row and col is odd
+		if (i+j)%2 != 0:
+			cell_color = self.TILE_COLOR_A
+		else:
+			#else color background color
+			cell_color = self.TILE_COLOR_B
+		pygame.draw.rect(screen, cell_color, rect, 0)
+		# draw the piece if any
+		if owner != self.PLAYER_NEITHER:
+			color = None
+			if frame == 0: # not currently animated
+				if owner == self.PLAYER_BLACK:
+					color = self.BLACK
+				elif owner == self.PLAYER_WHITE:
+					color = self.WHITE
+				pygame.draw.circle(screen, color, midpoint,radius,0)
+			else: #animate
+				# to simulate the piece being flipped draw an ellipse whose width decrease then increases
+				# on the increase change the color to the new owner
+				# flips along
+				if self.bunny[square]:
+					self.bonus_frame[square] = 1
+				rot = math.sin(frame)
+				if rot < 0:
+					rot *= -1
+					# flip color to current owner
+					if owner == self.PLAYER_BLACK:
+						color = self.BLACK
+					elif owner == self.PLAYER_WHITE:
+						color = self.WHITE
+				else:
+					# still flipping, draw with previous owner color
+					if owner == self.PLAYER_BLACK:
+						color = self.WHITE
+					elif owner == self.PLAYER_WHITE:
+						color = self.BLACK
+				# draw animated rotating disk effect with ellipse
+				w,h = radius*2/frame*rot, radius*2
+				x,y = midpoint[0]-radius/frame*rot, midpoint[1]-radius
+				pygame.draw.ellipse(screen, color, [x,y,w,h],0)
+				self.frame[square] = (frame+1) % self.Cell.FRAMES
+
+		if self.bunny[square]:
+			pos =  int(midpoint[0]-self.img.get_width()/2),\
+			  		int(midpoint[1]-self.img.get_height()/2)
+			screen.blit(self.img, pos)
+			bonus_frame = self.bonus_frame[square]
+			if bonus_frame > 0:
+				frame = self.frame[square]
+				x,y = rect[0], rect[1]
+				w,h = rect[2]+frame*2, rect[3]+frame*2
+				screen.blit(self.plus_one_text, [x,y,w,h])
+				self.bonus_frame[square] = (bonus_frame+1) % self.Cell.FRAMES
 
 	def get_intersecting_cell(self, pos):
 		'''
-		get_intersecting_cell gets the cell object that intersects with pos
+		get_intersecting_cell gets the cell object that intersects with pos, worked out from the offset and
+		cell size so it takes the same time on any size of board
 			pos : position to check if which cell intersects
 			return:
-				cell object
+				cell object, or None if pos is outside the board or on the edge of a cell
 		'''
-		for row in self.grid:
-			for cell in row:
-				if cell.does_intersect(pos):
-					return cell
-		return None
+		w, h = self.cell_size
+		if w <= 0 or h <= 0:
+			return None
+		i, x = divmod(pos[0]-self.offset[0], w)
+		j, y = divmod(pos[1]-self.offset[1], h)
+		# the edges of a cell are not inside it
+		if i < 0 or i >= self.DIMEN or j < 0 or j >= self.DIMEN or x == 0 or y == 0:
+			return None
+		return self.Cell(self, int(i)*self.DIMEN+int(j))
 
 	def get_owned_cells(self, player):
 		'''
@@ -379,12 +664,12 @@ class Board:
 			 return:
 			 	 list of owned cells
 		'''
-		return list(self.pieces[player].keys())		
+		return [self.Cell(self, square) for square in self.iter_squares(self.pieces[player])]
 
 	def get_moves(self, cell):
 		'''
 			get_moves
-			 	find all lines from the current cell to the nearest empty cell such that all cells in between do not 
+			 	find all lines from the current cell to the nearest empty cell such that all cells in between do not
 				have the same owner as the moving cell
 				Do this by searching immediate neighbors then following the lines from neighbor to empty while
 				owner is the opponent
@@ -392,125 +677,256 @@ class Board:
 	 		Returns a list of cells that are potential moves
 		'''
 		moves = []
-		if cell.owner == self.PLAYER_NEITHER:
+		owner = self.owner[cell.index]
+		if owner == self.PLAYER_NEITHER:
 			return moves # empty cell!
-		i,j = cell.grid_pos
-		# get each index of the neighbor and check if the move is valid
-		neighbor = None
-
-		for di in range(-1,2):
-			for dj in range(-1,2):
-				ni, nj = i+di, j+dj
-				if (ni, nj) != (i,j):
-					# check the neighbor, if it is opponent try to find move
-					if ni >= 0 and ni < self.DIMEN and nj >= 0 and nj < self.DIMEN:
-						neighbor = self.grid[ni][nj]
-						if neighbor.owner != self.PLAYER_NEITHER and neighbor.owner != cell.owner:  
-							# get the next cell in the same direction as neighbor 
-							search = True
-							while search:
-								ni, nj = ni+di, nj+dj
-								# if next cell is not beyond board
-								if ni < 0 or ni >= self.DIMEN or nj < 0 or nj >= self.DIMEN:
-									search = False # reached end of board 
-								else:
-									next_cell = self.grid[ni][nj]
-									 # if found empty cell!
-									if next_cell.owner == self.PLAYER_NEITHER:
-										# add this cell to moves
-										# if next_cell does not result in surrounding opponent then valid
-										# for each neighbor of next-cell, count owned cells 		
-										moves.append(next_cell)
-										search = False
-									elif next_cell.owner == cell.owner: # not opponent, cannot jump
-										search = False
-
-									#else keep searching
+		# follow each ray whose first square is the opponents and check if the move is valid
+		for ray in self.tables.rays[cell.index]:
+			neighbor = self.owner[ray[0]]
+			if neighbor != self.PLAYER_NEITHER and neighbor != owner:
+				for next_square in ray[1:]:
+					next_owner = self.owner[next_square]
+					# if found empty cell!
+					if next_owner == self.PLAYER_NEITHER:
+						# add this cell to moves
+						moves.append(self.Cell(self, next_square))
+						break
+					elif next_owner == owner: # not opponent, cannot jump
+						break
+					#else keep searching
 		return moves
 
 
-	def move_piece(self, move):
-		'''
-			move_piece performs the move and flips all pieces between to and from cell
-			move: move[0] is the cell to move from
-				 move[1] is the cell to move to
-		'''
-		self.wait = self.WAIT_TIME
-		# flips all cells in between the line segment created by  to and from 
-		# try for each cell from owned cells		
-		cell_from, cell_to = move
-		i, j =  cell_from.grid_pos
-		di, dj = self.get_move_delta(move)
-		ni, nj = i+di, j+dj
-		next_cell = None
-		continue_flipping = True
-		while continue_flipping  and \
-				ni >= 0 and ni < self.DIMEN and nj >= 0 and nj < self.DIMEN:
-			next_cell = self.grid[ni][nj]
-			# if cell is owned by opponent 
-			if next_cell.owner != cell_from.owner and next_cell.owner != self.PLAYER_NEITHER: 
-				# add piece to new owner remove from old
-				self.pieces[cell_from.owner][next_cell] = 1
-				del self.pieces[next_cell.owner][next_cell]
-				next_cell.flip() # flip owner and start animation
-				# add bonus
-				if next_cell.bunny:
-					self.player_bonuses[cell_from.owner]+=cell_from.BONUS
-			else:
-				continue_flipping  = False
-			ni, nj = ni+di, nj+dj
-		cell_to.owner = cell_from.owner
-		self.pieces[cell_from.owner][cell_to] = 1
+	def get_flips(self, player, square):
+		'''
+			get_flips
+				find every opponent piece bracketed by placing a piece on square
+				Do this by following the line in each direction from square while the owner is the opponent,
+				the run is kept only if it ends on a piece owned by player
+			player : player to move
+			square : square to drop the piece
+			Returns a list of squares that would be flipped, empty if the move is not legal
+		'''
+		flips = []
+		if self.owner[square] != self.PLAYER_NEITHER:
+			return flips # occupied cell!
+		opponent = self.toggle_player(player)
+		for ray in self.tables.rays[square]:
+			run = []
+			for next_square in ray:
+				next_owner = self.owner[next_square]
+				if next_owner == opponent:
+					run.append(next_square)
+				else:
+					# bracketed by players piece
+					if next_owner == player:
+						flips.extend(run)
+					break
+		return flips
+
+	def get_legal_squares(self, player):
+		'''
+			get_legal_squares
+				find every empty square next to an opponent piece that would flip at least one piece
+			player : player to move
+			Returns a list of squares player can drop a piece on
+		'''
+		opponent = self.toggle_player(player)
+		candidates = 0
+		for square in self.iter_squares(self.pieces[opponent]):
+			candidates |= self.tables.neighbor_masks[square]
+		candidates &= ~(self.pieces[player] | self.pieces[opponent])
+		return [square for square in self.iter_squares(candidates) if self.get_flips(player, square)]
+
+	def get_bonus(self, square, flips):
+		'''
+		get_bonus
+			square : square the piece was dropped on
+			flips : squares flipped by the move
+			return
+			bonus earned by the move, for each bunny placed on or flipped
+		'''
+		bunnies = self.bunny[square]
+		for flip in flips:
+			bunnies += self.bunny[flip]
+		return bunnies*self.Cell.BONUS
+
+	def apply_move(self, player, square):
+		'''
+			apply_move places a piece on square and flips all bracketed pieces, without animating
+			player : player to move
+			square : square to drop the piece
+			Returns the list of flipped squares, empty if the move is not legal and nothing changed
+		'''
+		flips = self.get_flips(player, square)
+		if flips:
+			self.set_owner(square, player)
+			for flip in flips:
+				self.set_owner(flip, player)
+			self.player_bonuses[player] += self.get_bonus(square, flips)
+		return flips
+
+	def undo_move(self, player, square, flips):
+		'''
+			undo_move reverts a move made by apply_move
+			player : player that moved
+			square : square the piece was dropped on
+			flips : squares returned by apply_move
+		'''
+		opponent = self.toggle_player(player)
+		self.player_bonuses[player] -= self.get_bonus(square, flips)
+		for flip in flips:
+			self.set_owner(flip, opponent)
+		self.set_owner(square, self.PLAYER_NEITHER)
+		self.winner = self.PLAYER_NEITHER
 
 
 	def move(self, player, cell_to):
 		'''
 		move:
-			for each player move from any owned cell to destination cell
+			drop a piece for player on the destination cell, flipping all bracketed pieces
 			player : player to move
 			cell_to : cell to drop the piece
+			return
+			list of flipped squares
+		'''
+		flips = self.apply_move(player, cell_to.index)
+		if flips:
+			self.wait = self.WAIT_TIME
+			# start flip animations
+			for flip in flips:
+				self.frame[flip] = 1
+			if self.bunny[cell_to.index]:
+				self.bonus_frame[cell_to.index] = 1
+		return flips
+
+
+	# ---------------------------- Tables Class ------------------------------------
+class Tables:
+	'''
+	Tables - Lookup tables for a board dimension, built once per dimension and shared by every board.
+			For every square it holds the ray of square numbers in each direction, the neighboring squares
+			and whether the square is a corner, X-square (diagonal to a corner), edge or inner square.
+	'''
+	INNER = 0
+	EDGE = 1
+	X_SQUARE = 2
+	CORNER = 3
+	# evaluation weight of owning a square of each kind
+	WEIGHTS = {INNER : 1, EDGE : 4, X_SQUARE : -8, CORNER : 20}
+	_cache = {} # dimen : tables
+
+	@classmethod
+	def get(cls, dimen):
+		'''
+		get returns the tables for the dimension, building them on first use
+			dimen : dimension of the grid
 		'''
-		moves = self.get_all_moves(player)
-		for move in moves:
-			if move[1] == cell_to:
-				self.move_piece(move)
-				if cell_to.bunny:
-					self.player_bonuses[cell_to.owner]+=cell_to.BONUS
-					cell_to.plus_one_frame = 1
-
-
-	def get_move_delta(self, move):
-		'''
-		gets the dx/dy of the cells defined in move
-			move : cell from and cell to ids
-			return : normalized dx/dy which direction vector to travel from move[0] to move[1]  
-		'''
-		cell_from, cell_to = move
-		i, j =  cell_from.grid_pos
-		fi, fj =  cell_to.grid_pos
-		di, dj = (fi-i), (fj-j)
-		# clamp directions to ints between [-1,1]
-		if di > 1:
-			di = 1
-		elif di < 0:
-			di = -1
-		if dj > 1:
-			dj = 1
-		elif dj < 0:
-			dj = -1
-		return (di, dj)
+		tables = cls._cache.get(dimen)
+		if tables is None:
+			tables = cls(dimen)
+			cls._cache[dimen] = tables
+		return tables
+
+	def __init__(self, dimen):
+		self.dimen = dimen
+		self.rays = [] # square : list of rays, a ray is a tuple of squares moving away in one direction
+		self.neighbors = [] # square : tuple of adjacent squares
+		self.neighbor_masks = [] # square : bitset of adjacent squares
+		self.kinds = bytearray(dimen*dimen) # square : kind of square
+		last = dimen-1
+		for i in range(0, dimen):
+			for j in range(0, dimen):
+				rays = []
+				for di, dj in Board.DIRECTIONS:
+					ray = []
+					ni, nj = i+di, j+dj
+					while ni >= 0 and ni < dimen and nj >= 0 and nj < dimen:
+						ray.append(ni*dimen+nj)
+						ni, nj = ni+di, nj+dj
+					if ray:
+						rays.append(tuple(ray))
+				neighbors = tuple(ray[0] for ray in rays)
+				mask = 0
+				for neighbor in neighbors:
+					mask |= 1 << neighbor
+				self.rays.append(rays)
+				self.neighbors.append(neighbors)
+				self.neighbor_masks.append(mask)
+				# classify square
+				if i in (0, last) and j in (0, last):
+					kind = self.CORNER
+				elif i in (1, last-1) and j in (1, last-1):
+					kind = self.X_SQUARE
+				elif i in (0, last) or j in (0, last):
+					kind = self.EDGE
+				else:
+					kind = self.INNER
+				self.kinds[i*dimen+j] = kind
+		self.weights = [self.WEIGHTS[kind] for kind in self.kinds] # square : evaluation weight
 
 
 class AI:
 	'''
 	AI is given a player ID and a reference to the board and will make random legal moves 
+	If given a depth it instead searches that many moves ahead for the best move
 	'''
 
-	def __init__(self, player, board):
+	def __init__(self, player, board, depth=0):
 		self.player = player
 		# reference to the board
 		self.board = board
-		random.seed(datetime.datetime.now())
+		self.depth = depth # moves to search ahead, 0 for random moves
+		self.think_time = 0 # seconds spent picking the last move
+		self.nodes = 0 # moves considered when picking the last move
+
+	@staticmethod
+	def evaluate(board, player):
+		'''
+			evaluate
+			returns how good the board is for player, the score difference plus the difference
+			of the weights of each players squares (corners are good, X-squares are bad)
+		'''
+		opponent = Board.toggle_player(player)
+		weights = board.tables.weights
+		value = board.get_score(player) - board.get_score(opponent)
+		for square in Board.iter_squares(board.pieces[player]):
+			value += weights[square]
+		for square in Board.iter_squares(board.pieces[opponent]):
+			value -= weights[square]
+		return value
+
+	def search(self, player, depth, alpha=-math.inf, beta=math.inf):
+		'''
+			search
+			negamax search with alpha-beta pruning, moves are made and undone on the board in place
+			player : player to move
+			depth : moves to search ahead
+			returns (value, square) value of the board for player and the best square, None if player must pass
+		'''
+		self.nodes += 1
+		board = self.board
+		if depth <= 0:
+			return AI.evaluate(board, player), None
+		opponent = Board.toggle_player(player)
+		squares = board.get_legal_squares(player)
+		if not squares:
+			# game over if neither player can move, else pass
+			if not board.get_legal_squares(opponent):
+				return AI.evaluate(board, player), None
+			return -self.search(opponent, depth-1, -beta, -alpha)[0], None
+		best_value, best_square = -math.inf, None
+		for square in squares:
+			flips = board.apply_move(player, square)
+			value = -self.search(opponent, depth-1, -beta, -alpha)[0]
+			board.undo_move(player, square, flips)
+			if value > best_value:
+				best_value, best_square = value, square
+			if value > alpha:
+				alpha = value
+			if alpha >= beta:
+				break
+		return best_value, best_square
 
 	def get_move(self):
 		'''
@@ -518,23 +934,141 @@ class AI:
 			returns board state if no move, or potential move (cell_from, cell_to)
 		'''
 		#stall 
+		start = time.perf_counter()
+		self.nodes = 0
 		move = Board.GAME_OVER
 		if not self.board.check_game_over():
 			move = Board.NO_MOVES # does not own any cells!
 			get_all_moves = self.board.get_all_moves(self.player)
+			# search ahead for the best move
+			if get_all_moves and self.depth > 0:
+				square = self.search(self.player, self.depth)[1]
+				move = [move for move in get_all_moves if move[1].index == square][0]
 			#shuffle the cells
-			if get_all_moves:
+			elif get_all_moves:
+				self.nodes = len(get_all_moves)
 				moves = []
 				while len(get_all_moves) > 0:
 					moves.append(get_all_moves.pop(random.randint(0, len(get_all_moves)-1)))
 				move = moves[random.randint(0, len(moves)-1)]
+		self.think_time = time.perf_counter()-start
 		return move
 
 
+# ---------------------------- Widget Classes ------------------------------------
+class Widget:
+	'''
+	Widget is a rect of the screen that can be drawn and hit by the mouse, such as a button or a whole board.
+	Widgets belong to a group, such as the start menu or the HUD, so only the widgets of the shown group are hit.
+	'''
+	HOVER_COLOR = [255,255,255]
+	__slots__ = ('id', 'rect', 'surface', 'group')
+	# ---------------------------- Widget Definitions ------------------------------------
+	def __init__(self, id, rect, surface=None, group=None):
+		'''
+			id : id returned when the widget is hit
+			rect : rect of the widget in screen space
+			surface : image drawn at the top left of rect, if any
+			group : group the widget is shown with
+		'''
+		self.id = id
+		self.rect = rect
+		self.surface = surface
+		self.group = group
+
+	def contains(self, pos):
+		'''
+		contains
+			pos : position in screen space
+			return
+			true if pos is inside the rect, the edges are not inside
+		'''
+		x, y, w, h = self.rect
+		return (pos[0] > x and pos[0] < x+w) and (pos[1] > y and pos[1] < y+h)
+
+	def draw(self, screen):
+		if self.surface is not None:
+			screen.blit(self.surface, self.rect)
+
+	def draw_highlight(self, screen, color=HOVER_COLOR, width=1):
+		'''
+		draw_highlight outlines the drawn image, or the rect if there is none
+		'''
+		if self.surface is not None:
+			rect = [self.rect[0], self.rect[1], self.surface.get_width(), self.surface.get_height()]
+		else:
+			rect = self.rect
+		pygame.draw.rect(screen, color, rect, width)
+
+
+class WidgetGrid:
+	'''
+	WidgetGrid is a spatial index of widgets. The screen is split into a grid of CELL_SIZE squares and each
+	widget is listed in every grid cell its rect overlaps, so a hit test only checks the few widgets of the
+	grid cell under the point no matter how many widgets there are.
+	'''
+	CELL_SIZE = 64
+	# ---------------------------- WidgetGrid Definitions ------------------------------------
+	def __init__(self, cell_size=CELL_SIZE):
+		self.cell_size = cell_size
+		self.cells = {} # (column, row) : widgets overlapping the grid cell, in the order they were added
+		self.groups = {} # group : widgets of the group, in the order they were added
+
+	def get_cells(self, rect):
+		'''
+		get_cells
+			rect : rect in screen space
+			return
+			generator of the grid cells the rect overlaps
+		'''
+		x, y, w, h = rect
+		size = self.cell_size
+		for column in range(int(x//size), int((x+w)//size)+1):
+			for row in range(int(y//size), int((y+h)//size)+1):
+				yield column, row
+
+	def add(self, widget):
+		'''
+		add adds a widget to the grid
+			return
+			the widget
+		'''
+		for cell in self.get_cells(widget.rect):
+			self.cells.setdefault(cell, []).append(widget)
+		self.groups.setdefault(widget.group, []).append(widget)
+		return widget
+
+	def get_group(self, group):
+		'''
+		get_group
+			return
+			widgets of the group, in the order they were added
+		'''
+		return self.groups.get(group, [])
+
+	def hit(self, pos, group=None):
+		'''
+		hit finds the widget at pos, widgets added later are on top
+			pos : position in screen space
+			group : only hit widgets of this group, if given
+			return
+			the widget hit, or None
+		'''
+		if pos is None:
+			return None
+		size = self.cell_size
+		widgets = self.cells.get((int(pos[0]//size), int(pos[1]//size)))
+		if widgets:
+			for widget in reversed(widgets):
+				if (group is None or widget.group == group) and widget.contains(pos):
+					return widget
+		return None
+
+
 # ---------------------------- Menu Class ------------------------------------
 class Menu:
 	'''
-	Menu is the series of buttons for the game over and start menu
+	Menu is the series of buttons for the game over and start menu, kept in a WidgetGrid for hit testing
 	'''
 	TEXT_COLOR = [0,55,250]
 	BUTTON_COLOR = [155,25,2]
@@ -542,11 +1076,14 @@ class Menu:
 	SMALL_SIZE = 6
 	MED_SIZE = 8
 	LARGE_SIZE = 10
+	START = 'start' # widget group of the start menu
+	GAME_OVER = 'game_over' # widget group of the game over menu
 	# ---------------------------- Menu Definitions ------------------------------------
 	def __init__(self, offset):
 		self.pos = offset
-		self.font = pygame.font.SysFont(None, 48)
-		self.buttons = {}
+		self.font = Assets.font(Board.FONT_SIZE)
+		self.buttons = {} # button id : widget
+		self.widgets = WidgetGrid()
 		# start buttons
 		start_buttons = ['1-PLAYER', '2-PLAYER'] 
 		size = (120, 32)
@@ -557,7 +1094,7 @@ class Menu:
 			text = self.font.render(label, True, self.TEXT_COLOR, self.BUTTON_COLOR)
 			text = pygame.transform.scale(text, size)
 			pos = (offset[0], offset[1]+size[1]*i)
-			self.buttons[label] = (text, pos, False)
+			self.add_button(label, text, pos, self.START)
 
 		# y pos  of size portion of menu 
 		size_height = pos[1]+size[1]+10
@@ -568,39 +1105,51 @@ class Menu:
 			text = self.font.render(label, True, self.TEXT_COLOR, self.BUTTON_COLOR)
 			text = pygame.transform.scale(text, (int(size[0]/4), size[1]  ))
 			pos = (offset[0]+((size[0]/4)+size[0]/8)*i, size_height)
-			
-			self.buttons[label] = (text, pos, False)
+			self.add_button(label, text, pos, self.START)
 		
 
 		# ---- game_over buttons ----
-		game_over_buttons = ['RETRY', 'EXIT'] 
+		game_over_buttons = ['RETRY', 'EXIT', 'REPLAY'] 
 		# exit is at same location as start, but is displayed at game_over only
 		for i in range(0,len(game_over_buttons)):
 			label = game_over_buttons[i] 
 			text = self.font.render(label, True, self.TEXT_COLOR, self.BUTTON_COLOR)
 			text = pygame.transform.scale(text, size)
 			pos = (offset[0], offset[1]+size[1]*i)
-			self.buttons[label] = (text, pos, True)
+			self.add_button(label, text, pos, self.GAME_OVER)
 
 		# selected size button
 		self.selected_size = 'S' 
 
 
-	def draw(self, screen, game_over=False):
+	def add_button(self, label, text, pos, group):
+		'''
+		add_button
+			label : button id
+			text : rendered button
+			pos : top left of the button in screen space
+			group : START or GAME_OVER
+		'''
+		widget = Widget(label, [pos[0], pos[1], text.get_width(), text.get_height()], text, group)
+		self.buttons[label] = self.widgets.add(widget)
+
+	def get_group(self, game_over):
+		return self.GAME_OVER if game_over else self.START
+
+
+	def draw(self, screen, game_over=False, hover=None):
 		'''
 		draw : draws menu
 			screen : screen to draw on
 			game_over : if true, check buttons displayed during gameover, else check start menu
+			hover : id of the button under the mouse, to highlight
 		'''
-		keys  = list(self.buttons.keys())
-		for i in range(0, len(keys)):
-			key = keys[i]
-			text, pos, is_game_over = self.buttons[key]
-			if game_over == is_game_over:
-				screen.blit(text, pos)
-				if key == self.selected_size:
-					rect = [pos[0],pos[1],text.get_width(),text.get_height()]
-					pygame.draw.rect(screen, self.HIGHLIGHT_COLOR, rect, 3)
+		for widget in self.widgets.get_group(self.get_group(game_over)):
+			widget.draw(screen)
+			if widget.id == self.selected_size:
+				widget.draw_highlight(screen, self.HIGHLIGHT_COLOR, 3)
+			elif widget.id == hover:
+				widget.draw_highlight(screen)
 
 	
 	def select_size(self, size_id):
@@ -636,16 +1185,8 @@ class Menu:
 			 	button id
 
 		'''
-		keys  = list(self.buttons.keys())
-		for i in range(0, len(keys)):
-			text, button_pos, is_game_over  = self.buttons[keys[i]]
-			size = text.get_width(),text.get_height()
-			if game_over == is_game_over:
-				if (pos[0] > button_pos[0] and pos[0] < button_pos[0]+size[0]) \
-					and (pos[1] > button_pos[1] and pos[1] < button_pos[1]+size[1]):
-					return keys[i]
-	
-		return None
+		widget = self.widgets.hit(pos, self.get_group(game_over))
+		return widget.id if widget else None
 
 # ---------------------------- ScoreBoard Class ------------------------------------
 class ScoreBoard:
@@ -653,7 +1194,7 @@ class ScoreBoard:
 	# ---------------------------- ScoreBoard Definitions ------------------------------------
 	def __init__(self, pos):
 		self.font_height = 34
-		self.font = pygame.font.SysFont(None, self.font_height)
+		self.font = Assets.font(self.font_height)
 		self.pos = pos
 		self.radius = self.font_height//4
 
@@ -693,8 +1234,692 @@ class ScoreBoard:
 		pygame.draw.circle(screen, color, midpoint,self.radius,0)
 		pygame.draw.circle(screen, Board.Cell.HIGHLIGHT_PIECE_COLOR, midpoint,self.radius,0)
 
+# ---------------------------- Telemetry Class ------------------------------------
+class Telemetry:
+	'''
+	Telemetry is an opt in sink that writes one JSON record per line for each game start, move, pass and game end.
+	Records are queued by the game loop and written in batches by a background thread, so logging never
+	waits on the disk. Once the file grows past max_bytes it is rotated to path.1, path.2, ... path.backups
+	Telemetry is enabled by setting the OTHELLO_TELEMETRY environment variable to the file to write to.
+	'''
+	ENV = 'OTHELLO_TELEMETRY'
+	MAX_BYTES = 8*1024*1024 # size to rotate the file at
+	BACKUPS = 4 # rotated files kept
+	BATCH_SIZE = 256 # records written at once
+	FLUSH_TIME = 1.0 # seconds a record waits before it is written
+	# ---------------------------- Telemetry Definitions ------------------------------------
+	def __init__(self, path=None, max_bytes=MAX_BYTES, backups=BACKUPS):
+		'''
+			path : file to write records to, if None telemetry is disabled
+			max_bytes : size to rotate the file at
+			backups : number of rotated files to keep
+		'''
+		self.path = path
+		self.max_bytes = max_bytes
+		self.backups = backups
+		self.game = None # id of the current game
+		self.moves = 0 # moves made in the current game
+		self.start_time = 0 # time the current game started
+		self.reset_frames()
+		self.queue = queue.Queue()
+		self.thread = None
+		if path:
+			self.thread = threading.Thread(target=self.run, name='telemetry', daemon=True)
+			self.thread.start()
+
+	def is_enabled(self):
+		return self.thread is not None
+
+	def reset_frames(self):
+		self.frames = 0 # frames since the last record
+		self.frame_total = 0.0 # seconds spent in those frames
+		self.frame_max = 0.0 # longest of those frames
+
+	def frame(self, frame_time):
+		'''
+		frame adds the time of a frame to the frame stats of the next record
+			frame_time : seconds spent on the frame
+		'''
+		self.frames += 1
+		self.frame_total += frame_time
+		if frame_time > self.frame_max:
+			self.frame_max = frame_time
+
+	def log(self, event, **fields):
+		'''
+		log queues a record to be written
+			event : type of record
+			fields : values of the record, must be json serializable
+		'''
+		if not self.is_enabled():
+			return
+		record = {'event' : event, 'time' : time.time(), 'game' : self.game}
+		record.update(fields)
+		if self.frames > 0:
+			record['frames'] = {
+				'count' : self.frames,
+				'mean_ms' : round(self.frame_total/self.frames*1000, 3),
+				'max_ms' : round(self.frame_max*1000, 3),
+			}
+			self.reset_frames()
+		self.queue.put(record)
+
+	def game_start(self, board, vs_ai, player):
+		'''
+		game_start records a new game
+			board : board of the game
+			vs_ai : true if playing against the ai
+			player : player that moves first
+		'''
+		self.game = uuid.uuid4().hex
+		self.moves = 0
+		self.start_time = time.time()
+		self.log('game_start', dimen=board.DIMEN, bunnies=board.get_bunnies(), vs_ai=vs_ai, player=player)
+
+	def move(self, board, player, square, flips, ai=None):
+		'''
+		move records a move
+			board : board the move was made on
+			player : player that moved
+			square : square the piece was dropped on
+			flips : squares flipped by the move
+			ai : ai that picked the move, if any
+		'''
+		self.moves += 1
+		fields = {
+			'dimen' : board.DIMEN,
+			'player' : player,
+			'square' : square,
+			'flips' : flips,
+			'bonus' : board.get_bonus(square, flips),
+		}
+		if ai:
+			fields['think_ms'] = round(ai.think_time*1000, 3)
+			fields['nodes'] = ai.nodes
+		self.log('move', **fields)
+
+	def pass_turn(self, board, player):
+		'''
+		pass_turn records a player without a move
+			board : board of the game
+			player : player that passed
+		'''
+		self.log('pass', dimen=board.DIMEN, player=player)
+
+	def game_end(self, board, reason):
+		'''
+		game_end records the end of a game
+			board : board of the game
+			reason : 'over' if the game was finished, or 'exit' if it was left
+		'''
+		self.log('game_end', dimen=board.DIMEN, reason=reason, winner=board.get_winner(), moves=self.moves,
+			scores=[board.get_score(Board.PLAYER_BLACK), board.get_score(Board.PLAYER_WHITE)],
+			bonuses=[board.player_bonuses[Board.PLAYER_BLACK], board.player_bonuses[Board.PLAYER_WHITE]],
+			duration=round(time.time()-self.start_time, 3))
+		self.game = None
+
+	def close(self):
+		'''
+		close writes any queued records and stops the writer thread
+		'''
+		if self.is_enabled():
+			self.queue.put(None)
+			self.thread.join()
+			self.thread = None
+
+	def run(self):
+		'''
+		run is the writer thread, waits for records and writes them in batches
+		'''
+		running = True
+		while running:
+			batch = [self.queue.get()]
+			deadline = time.time()+self.FLUSH_TIME
+			# gather a batch until full or the first record has waited long enough
+			while batch[-1] is not None and len(batch) < self.BATCH_SIZE:
+				timeout = deadline-time.time()
+				if timeout <= 0:
+					break
+				try:
+					batch.append(self.queue.get(timeout=timeout))
+				except queue.Empty:
+					break
+			if batch[-1] is None:
+				running = False
+				batch.pop()
+			if batch:
+				self.write(''.join(json.dumps(record, separators=(',',':'))+'\n' for record in batch))
+
+	def write(self, text):
+		'''
+		write appends text to the file, rotating it first if it would grow past max_bytes
+			text : lines to write
+		'''
+		data = text.encode('utf-8')
+		if os.path.exists(self.path) and os.path.getsize(self.path)+len(data) > self.max_bytes:
+			self.rotate()
+		with open(self.path, 'ab') as f:
+			f.write(data)
+
+	def rotate(self):
+		'''
+		rotate renames path.n to path.n+1 dropping the oldest, then path to path.1
+		'''
+		for i in range(self.backups-1, 0, -1):
+			src = '%s.%d' % (self.path, i)
+			if os.path.exists(src):
+				os.replace(src, '%s.%d' % (self.path, i+1))
+		if self.backups > 0:
+			os.replace(self.path, self.path+'.1')
+		else:
+			os.remove(self.path)
+
+# ---------------------------- GameRecord Class ------------------------------------
+class GameRecord:
+	'''
+	GameRecord is a finished game stored so that it can be replayed from any move.
+	On disk a record is a header with DIMEN, the first player and the bunny squares, then one byte per move
+	(the square, or PASS) and a keyframe snapshot of the position every KEYFRAME_INTERVAL moves. Seeking to a
+	move restores the nearest keyframe and replays at most KEYFRAME_INTERVAL-1 moves.
+	Records are appended one after another to an archive file, which is read back one record at a time.
+	A record left incomplete at the end of an archive by an interrupted save is skipped.
+	Recording is enabled by setting the OTHELLO_RECORD environment variable to the archive to append to.
+	'''
+	ENV = 'OTHELLO_RECORD'
+	MAGIC = b'OTHR'
+	VERSION = 1
+	HEADER = struct.Struct('<4sBBBBBH') # magic, version, dimen, first player, keyframe interval, bunnies, moves
+	BONUSES = struct.Struct('<HH') # black and white bonuses of a keyframe
+	KEYFRAME_INTERVAL = 8
+	PASS = 255 # move of a player without a move
+	# ---------------------------- GameRecord Definitions ------------------------------------
+	def __init__(self, dimen, bunnies, player, interval=KEYFRAME_INTERVAL):
+		'''
+			dimen : dimension of the grid
+			bunnies : squares with a bunny
+			player : player that moves first
+			interval : moves between keyframes
+		'''
+		self.dimen = dimen
+		self.bunnies = list(bunnies)
+		self.player = player
+		self.interval = interval
+		self.moves = [] # square of each move, or PASS
+		# position after every interval moves, (owner, (black bonus, white bonus))
+		self.keyframes = [(array.array('b', Board((0, 0), (dimen, dimen), dimen, self.bunnies).owner), (0, 0))]
+
+	def __len__(self):
+		return len(self.moves)
+
+	def get_player(self, index):
+		'''
+		get_player
+			index : number of moves made
+			return
+			player to move after index moves
+		'''
+		return (self.player+index)%2
+
+	def add_move(self, board, square):
+		'''
+		add_move records the next move, taking a keyframe of the board if due
+			board : board after the move was made
+			square : square the piece was dropped on, or PASS
+		'''
+		self.moves.append(square)
+		if len(self.moves) % self.interval == 0:
+			bonuses = board.player_bonuses[Board.PLAYER_BLACK], board.player_bonuses[Board.PLAYER_WHITE]
+			self.keyframes.append((array.array('b', board.owner), bonuses))
+
+	def get_board(self, index, offset=None, size=None):
+		'''
+		get_board
+			index : number of moves made
+			offset : position in screen space to draw the board at
+			size : size of the board in screen space
+			return
+			new board with the position after index moves
+		'''
+		index = max(0, min(index, len(self.moves)))
+		board = Board(offset or (0, 0), size or (self.dimen, self.dimen), self.dimen, self.bunnies)
+		keyframe = index//self.interval
+		owner, bonuses = self.keyframes[keyframe]
+		board.load_position(owner, bonuses)
+		for i in range(keyframe*self.interval, index):
+			if self.moves[i] != self.PASS:
+				board.apply_move(self.get_player(i), self.moves[i])
+		return board
+
+	@staticmethod
+	def pack_owner(owner):
+		'''
+		pack_owner packs the owner of each square into 2 bits
+		'''
+		data = bytearray((len(owner)+3)//4)
+		for square in range(0, len(owner)):
+			data[square//4] |= (owner[square]+1) << (square%4*2)
+		return bytes(data)
+
+	@staticmethod
+	def unpack_owner(data, squares):
+		'''
+		unpack_owner unpacks the owners packed by pack_owner
+		'''
+		return array.array('b', [((data[square//4] >> (square%4*2)) & 3)-1 for square in range(0, squares)])
+
+	def to_bytes(self):
+		'''
+		to_bytes
+			return
+			the record in its on disk format
+		'''
+		data = [self.HEADER.pack(self.MAGIC, self.VERSION, self.dimen, self.player, self.interval,
+			len(self.bunnies), len(self.moves)), bytes(self.bunnies), bytes(self.moves)]
+		for owner, bonuses in self.keyframes:
+			data.append(self.pack_owner(owner))
+			data.append(self.BONUSES.pack(*bonuses))
+		return b''.join(data)
+
+	def save(self, path):
+		'''
+		save appends the record to an archive
+			path : archive file
+		'''
+		with open(path, 'ab') as f:
+			f.write(self.to_bytes())
+
+	@classmethod
+	def read(cls, f):
+		'''
+		read reads the next record from a file
+			f : binary file positioned at the start of a record
+			return
+			the record, or None at the end of the file or at a record cut short by an interrupted save
+		'''
+		header = f.read(cls.HEADER.size)
+		if len(header) < cls.HEADER.size:
+			return None
+		magic, version, dimen, player, interval, bunnies, moves = cls.HEADER.unpack(header)
+		if magic != cls.MAGIC or version != cls.VERSION or interval == 0:
+			raise ValueError('not a game record')
+		squares = dimen*dimen
+		owner_size = (squares+3)//4
+		keyframe_size = owner_size+cls.BONUSES.size
+		keyframes = moves//interval+1
+		# read the whole record at once so a truncated tail is caught before anything is unpacked
+		data = f.read(bunnies+moves+keyframes*keyframe_size)
+		if len(data) < bunnies+moves+keyframes*keyframe_size:
+			return None
+		record = cls.__new__(cls)
+		record.dimen, record.player, record.interval = dimen, player, interval
+		record.bunnies = list(data[:bunnies])
+		record.moves = list(data[bunnies:bunnies+moves])
+		record.keyframes = []
+		pos = bunnies+moves
+		for i in range(0, keyframes):
+			owner = cls.unpack_owner(data[pos:pos+owner_size], squares)
+			record.keyframes.append((owner, cls.BONUSES.unpack_from(data, pos+owner_size)))
+			pos += keyframe_size
+		return record
+
+	@classmethod
+	def iter_file(cls, path):
+		'''
+		iter_file reads the records of an archive one at a time
+			path : archive file
+			return
+			generator of records
+		'''
+		with open(path, 'rb') as f:
+			record = cls.read(f)
+			while record is not None:
+				yield record
+				record = cls.read(f)
+
+
+# ---------------------------- Replay Class ------------------------------------
+class Replay:
+	'''
+	Replay is the viewer for a GameRecord, it draws the board at the current move and a slider
+	that can be clicked or dragged to seek to any move. The arrow keys and mouse wheel step through the moves.
+	'''
+	SLIDER_COLOR = [155,25,2]
+	KNOB_COLOR = [255,255,0]
+	TEXT_COLOR = [0,155,250]
+	# ---------------------------- Replay Definitions ------------------------------------
+	def __init__(self, record, offset, size, slider):
+		'''
+			record : record to replay
+			offset : position in screen space to draw the board at
+			size : size of the board in screen space
+			slider : rect of the slider in screen space
+		'''
+		self.record = record
+		self.offset = offset
+		self.size = size
+		self.slider = slider
+		self.font = Assets.font(34)
+		self.index = None
+		self.board = None
+		self.seek(len(record))
+
+	def seek(self, index):
+		'''
+		seek shows the position after index moves
+			index : number of moves made
+		'''
+		index = max(0, min(index, len(self.record)))
+		if index != self.index:
+			self.index = index
+			self.board = self.record.get_board(index, self.offset, self.size)
+
+	def step(self, delta):
+		'''
+		step moves forward or back through the moves
+			delta : number of moves to step, negative to step back
+		'''
+		self.seek(self.index+delta)
+
+	def seek_to_pos(self, pos):
+		'''
+		seek_to_pos seeks to the move under pos if pos is on the slider
+			pos : position in screen space
+			return
+			true if pos is on the slider
+		'''
+		x, y, w, h = self.slider
+		if pos[0] < x or pos[0] > x+w or pos[1] < y or pos[1] > y+h:
+			return False
+		self.seek(int(round((pos[0]-x)/w*len(self.record))))
+		return True
+
+	def get_player(self):
+		'''
+		get_player
+			return
+			player to move at the current move
+		'''
+		return self.record.get_player(self.index)
+
+	def draw(self, screen):
+		'''
+		draw draws the board at the current move, the slider and the move number
+			screen : screen to draw on
+		'''
+		self.board.draw(screen)
+		x, y, w, h = self.slider
+		pygame.draw.rect(screen, self.SLIDER_COLOR, self.slider, 0)
+		knob_x = x + (w*self.index//len(self.record) if len(self.record) else 0)
+		pygame.draw.rect(screen, self.KNOB_COLOR, [knob_x-3, y, 6, h], 0)
+		text = self.font.render(str(self.index)+'/'+str(len(self.record)), True, self.TEXT_COLOR)
+		screen.blit(text, (x+w+10, y))
+
+# ---------------------------- Exhibition Classes ------------------------------------
+def pick_move(dimen, bunnies, owner, bonuses, player, depth, seed):
+	'''
+	pick_move picks the AI's move for a position, run on the exhibition's worker processes
+		dimen : dimension of the grid
+		bunnies : squares with a bunny
+		owner : owner of each square as bytes
+		bonuses : (black bonus, white bonus)
+		player : player to move
+		depth : moves to search ahead, 0 for a random move
+		seed : seed of the random move
+		return
+		square to drop the piece on, or None if player has no move
+	'''
+	board = Board((0, 0), (dimen, dimen), dimen, bunnies)
+	board.load_position(owner, bonuses)
+	if depth > 0:
+		return AI(player, board, depth).search(player, depth)[1]
+	squares = board.get_legal_squares(player)
+	return random.Random(seed).choice(squares) if squares else None
+
+
+class Match:
+	'''
+	Match is one game of an Exhibition, drawn in its own viewport of the window with a label of the scores.
+	The board is placed in the viewport through the Board offset and size.
+	'''
+	LABEL_HEIGHT = 20
+	MARGIN = 4
+	RESTART_FRAMES = 120 # frames an AI only game is shown after it ends before the next starts
+	BG_COLOR = [5,5,32]
+	TEXT_COLOR = [0,155,250]
+	# ---------------------------- Match Definitions ------------------------------------
+	def __init__(self, viewport, dimen, ai_players, depth):
+		'''
+			viewport : rect of the match in screen space
+			dimen : dimension of the grid
+			ai_players : players moved by the AI
+			depth : moves the AI searches ahead
+		'''
+		self.viewport = viewport
+		self.dimen = dimen
+		self.ai_players = ai_players
+		self.depth = depth
+		x, y, w, h = viewport
+		side = min(w, h-self.LABEL_HEIGHT) - 2*self.MARGIN
+		self.offset = (x+(w-side)//2, y+self.LABEL_HEIGHT+self.MARGIN)
+		self.size = (side, side)
+		self.label = [x, y, w, self.LABEL_HEIGHT]
+		self.pending = None # future of the AI move being searched
+		self.queued = False # waiting for a worker
+		self.new_game()
+
+	def new_game(self):
+		self.board = Board(self.offset, self.size, self.dimen)
+		self.board.invalidate()
+		self.current_player = Board.PLAYER_BLACK
+		self.winner = None
+		self.finished = 0 # frames since the game ended
+		self.check_turn = True # if the current player may have to pass
+		self.dirty = True # if the label needs redrawing
+
+	def is_ai_turn(self):
+		return self.current_player in self.ai_players
+
+	def needs_ai(self):
+		'''
+		needs_ai
+			return
+			true if the AI has to pick the next move and is not already doing so
+		'''
+		return self.winner is None and self.is_ai_turn() and not self.check_turn and self.pending is None \
+			and not self.queued and not self.board.is_waiting()
+
+	def get_job(self, seed):
+		'''
+		get_job
+			return
+			arguments of pick_move for the current position
+		'''
+		board = self.board
+		bonuses = board.player_bonuses[Board.PLAYER_BLACK], board.player_bonuses[Board.PLAYER_WHITE]
+		return (self.dimen, board.get_bunnies(), board.owner.tobytes(), bonuses, self.current_player, self.depth, seed)
+
+	def play(self, square):
+		'''
+		play makes the current players move and passes the turn
+			square : square to drop the piece on, or None to pass
+		'''
+		if square is not None:
+			self.board.move(self.current_player, self.board.Cell(self.board, square))
+		self.current_player = Board.toggle_player(self.current_player)
+		self.check_turn = True
+		self.dirty = True
+
+	def update(self):
+		'''
+		update ends the game or passes the turn when the current player cannot move, once per turn
+		'''
+		if self.winner is not None:
+			self.finished += 1
+			if self.finished >= self.RESTART_FRAMES and len(self.ai_players) == 2:
+				self.new_game()
+		elif self.check_turn and not self.board.is_waiting():
+			self.check_turn = False
+			if self.board.check_game_over():
+				self.winner = self.board.get_winner()
+				self.dirty = True
+			elif not self.board.get_legal_squares(self.current_player):
+				self.play(None)
+
+	def click(self, pos):
+		'''
+		click makes a human move on the clicked square, or starts a new game once the game is over
+			pos : position in screen space
+		'''
+		if self.winner is not None:
+			self.new_game()
+		elif not self.is_ai_turn() and not self.check_turn and not self.board.is_waiting():
+			cell = self.board.get_intersecting_cell(pos)
+			if cell and self.board.get_flips(self.current_player, cell.index):
+				self.play(cell.index)
+
+	def draw(self, screen, font):
+		'''
+		draw draws the squares of the board that changed, and the label if it changed
+			screen : screen to draw on
+			font : font of the label
+			return
+				list of rects drawn
+		'''
+		rects = self.board.draw_changed(screen)
+		if self.dirty:
+			self.dirty = False
+			black = self.board.get_score(Board.PLAYER_BLACK)
+			white = self.board.get_score(Board.PLAYER_WHITE)
+			if self.winner == Board.PLAYER_BLACK:
+				status = 'Black wins'
+			elif self.winner == Board.PLAYER_WHITE:
+				status = 'White wins'
+			elif self.winner == Board.TIE:
+				status = 'Tie'
+			else:
+				status = ['Black', 'White'][self.current_player]+' to move'
+			text = font.render('Black %d  White %d  %s' % (black, white, status), True, self.TEXT_COLOR)
+			pygame.draw.rect(screen, self.BG_COLOR, self.label, 0)
+			# long labels are cut off at the viewport, the neighbors label is not redrawn over them
+			clip = screen.get_clip()
+			screen.set_clip(self.label)
+			screen.blit(text, (self.label[0]+self.MARGIN, self.label[1]+(self.label[3]-text.get_height())//2))
+			screen.set_clip(clip)
+			rects.append(self.label)
+		return rects
+
+
+class Exhibition:
+	'''
+	Exhibition hosts many concurrent matches in one window, either AI against AI or the AI against N humans.
+	The matches are laid out in a grid of viewports. AI moves for every match are searched on a shared pool of
+	worker processes, handed out first come first served with at most one search per worker in flight, so no
+	match waits behind another matches next move. Each frame only the squares and labels that changed are
+	repainted.
+	'''
+	WINDOW_SIZE = (960, 960)
+	BG_COLOR = [5,5,32]
+	FONT_SIZE = 20
+	# ---------------------------- Exhibition Definitions ------------------------------------
+	def __init__(self, count, humans=False, dimen=8, depth=1, workers=None):
+		'''
+			count : number of matches
+			humans : if true humans play black against the AI, else the AI plays both sides
+			dimen : dimension of the grids
+			depth : moves the AI searches ahead, 0 for random moves
+			workers : number of worker processes, defaults to the number of cpus
+		'''
+		self.count = count
+		self.dimen = dimen
+		self.depth = depth
+		self.workers = workers or os.cpu_count() or 1
+		self.searches = 0 # AI searches finished
+		self.cols = int(math.ceil(math.sqrt(count)))
+		self.rows = int(math.ceil(count/self.cols))
+		self.viewport_size = w, h = self.WINDOW_SIZE[0]//self.cols, self.WINDOW_SIZE[1]//self.rows
+		ai_players = {Board.PLAYER_WHITE} if humans else {Board.PLAYER_BLACK, Board.PLAYER_WHITE}
+		self.matches = [Match(((i%self.cols)*w, (i//self.cols)*h, w, h), dimen, ai_players, depth) for i in range(0, count)]
+
+	def get_match(self, pos):
+		'''
+		get_match
+			pos : position in screen space
+			return
+			match whose viewport holds pos, or None
+		'''
+		col = pos[0]//self.viewport_size[0]
+		row = pos[1]//self.viewport_size[1]
+		i = row*self.cols+col
+		if col < self.cols and i < len(self.matches):
+			return self.matches[i]
+		return None
+
+	def run(self, events=pygame.event.get, fps=60):
+		'''
+		run runs the exhibition until the window is closed
+			events : returns the events of each frame
+			fps : frame rate cap, 0 to run uncapped
+		'''
+		pygame.init()
+		screen = pygame.display.set_mode(self.WINDOW_SIZE)
+		pygame.display.set_caption("Othello/Reversi Exhibition")
+		clock = pygame.time.Clock()
+		font = Assets.font(self.FONT_SIZE)
+		rng = random.Random()
+		waiting = collections.deque() # matches waiting for a worker, in the order they asked
+		in_flight = 0
+		screen.fill(self.BG_COLOR)
+		pygame.display.flip()
+		exit = False
+		frame = 0
+		with concurrent.futures.ProcessPoolExecutor(self.workers) as pool:
+			while not exit:
+				clock.tick(fps)
+				for event in events():
+					if event.type == pygame.QUIT:
+						exit = True
+					elif event.type == pygame.MOUSEBUTTONDOWN:
+						match = self.get_match(event.pos)
+						if match:
+							match.click(event.pos)
+				for match in self.matches:
+					# apply finished searches
+					if match.pending and match.pending.done():
+						square = match.pending.result()
+						match.pending = None
+						in_flight -= 1
+						self.searches += 1
+						match.play(square)
+					match.update()
+					if match.needs_ai():
+						match.queued = True
+						waiting.append(match)
+				# hand out searches in the order they were asked for
+				while waiting and in_flight < self.workers:
+					match = waiting.popleft()
+					match.queued = False
+					match.pending = pool.submit(pick_move, *match.get_job(rng.random()))
+					in_flight += 1
+				rects = []
+				for match in self.matches:
+					rects.extend(match.draw(screen, font))
+				if rects:
+					pygame.display.update(rects)
+				frame += 1
+				if frame % 60 == 0:
+					pygame.display.set_caption("Othello/Reversi Exhibition %d boards %.0f fps" % (self.count, clock.get_fps()))
+			for match in self.matches:
+				if match.pending:
+					match.pending.cancel()
+
 # ---------------------------- Main Entry Point ------------------------------------
-def main():
+def main(replay_path=None, events=pygame.event.get, fps=10):
+	'''
+	main runs the game
+		replay_path : archive of game records to replay instead of showing the start menu
+		events : returns the events of each frame, the benchmark passes scripted input here
+		fps : frame rate cap, 0 to run uncapped
+	'''
 	# window and board size and position settings
 	BG_COLOR = [5,5,32]
 	border = 2
@@ -714,42 +1939,73 @@ def main():
 	draw_board =False 		# if state should draw the board
 	start_new_game = False  # if to start a new game
 	game_over = False       # if game has ended
+	record = None           # record of the current game
+	replay = None           # replay being viewed, if any
+	replays = None          # records left in the archive being replayed
+	hover_pos = None        # last position of the mouse
 	# setup
 	pygame.init()
+	pygame.key.set_repeat(300, 30) # held arrow keys scrub through a replay
 	screen = pygame.display.set_mode(size)
 	pygame.display.set_caption("Othello/Reversi ")
 	clock = pygame.time.Clock()
+	telemetry = Telemetry(os.environ.get(Telemetry.ENV))
+	record_path = os.environ.get(GameRecord.ENV)
+	# load the bunny for every menu size while the menu is showing
+	board_size = (size[0], size[0])
+	bunny_sizes = [Board.get_bunny_size(board_size, dimen) for dimen in (Menu.SMALL_SIZE, Menu.MED_SIZE, Menu.LARGE_SIZE)]
+	Assets.preload(Board.BUNNY_FILE, bunny_sizes, (Board.Cell.FONT_SIZE,))
 	menu = Menu((size[0]//2,size[1]//2))
 	
 	# the exis and show hint hhud displayed during a game
-	hud_font = pygame.font.SysFont(None, 34)
+	hud_font = Assets.font(34)
 	hud_size = (200, 34)
 
 	hint_text = hud_font.render('Show Hint', True, Menu.TEXT_COLOR, Menu.BUTTON_COLOR)
-	hint_button = (border, border,hud_size[0] ,hud_size[1])
 	exit_text = hud_font.render('Exit', True, Menu.TEXT_COLOR, Menu.BUTTON_COLOR)
-	exit_button = (size[0]-border-exit_text.get_width(), border, hud_size[0] ,hud_size[1])
-	hud = [hint_button, exit_button]
+	# hud buttons and the board, for hit testing the mouse during a game
+	hud = WidgetGrid()
+	hint_button = hud.add(Widget('hint', [border, border, hud_size[0], hud_size[1]], hint_text))
+	exit_button = hud.add(Widget('exit', [size[0]-border-exit_text.get_width(), border, hud_size[0], hud_size[1]], exit_text))
+	board_widget = hud.add(Widget('board', [offset[0], offset[1], board_size[0], board_size[1]]))
+	# the replay slider takes the place of the hint button
+	slider = (border+8, border+8, size[0]//2, hud_size[1]-16)
+	replay_score_board = ScoreBoard((offset[0], offset[1]+size[0]))
+	if replay_path:
+		replays = GameRecord.iter_file(replay_path)
+		replay_record = next(replays, None)
+		if replay_record is not None:
+			replay = Replay(replay_record, offset, board_size, slider)
 	# main while loop
 	while not exit:
 		mouse_clicked = False
-		clock.tick(10)
-		for event in pygame.event.get(): 
+		key = None
+		wheel = 0
+		drag_pos = None
+		clock.tick(max(fps, 30) if replay and fps else fps)
+		frame_start = time.perf_counter()
+		for event in events(): 
 			if event.type == pygame.QUIT:
 				exit=True 
 			elif event.type == pygame.KEYDOWN:
-				a = None # do nothing
+				key = event.key
+			elif event.type == pygame.MOUSEWHEEL:
+				wheel += event.y
+			elif event.type == pygame.MOUSEMOTION:
+				hover_pos = event.pos
+				if event.buttons[0]:
+					drag_pos = event.pos
 			elif event.type == pygame.MOUSEBUTTONDOWN:
 				# if it is the current players turn!
 				mouse_clicked = True
-				mouse_pos = pygame.mouse.get_pos()
+				mouse_pos = event.pos
 
 		# if new game is started reinitialize board and player vars
 		if start_new_game:
 			current_player = random.randint(Board.PLAYER_BLACK, Board.PLAYER_WHITE)
 			# set dimension before creating
 			Board.DIMEN = menu.get_size()
-			board = Board( offset, (size[0], size[0])  ) 
+			board = Board( offset, board_size ) 
 			score_board = ScoreBoard((offset[0], offset[1]+size[0]))
 			current_player = Board.PLAYER_BLACK
 			ai = AI(Board.PLAYER_WHITE, board) 
@@ -758,16 +2014,54 @@ def main():
 			show_start_menu = False
 			start_new_game = False
 			played = False
+			telemetry.game_start(board, vs_ai, current_player)
+			record = GameRecord(board.DIMEN, board.get_bunnies(), current_player)
 
 		# clear screen
 		screen.fill(BG_COLOR)
 
-		if draw_board:
+		if replay:
+			leave_replay = key == pygame.K_ESCAPE
+			if key == pygame.K_LEFT:
+				replay.step(-1)
+			elif key == pygame.K_RIGHT:
+				replay.step(1)
+			elif key == pygame.K_HOME:
+				replay.seek(0)
+			elif key == pygame.K_END:
+				replay.seek(len(replay.record))
+			elif key == pygame.K_n and replays:
+				# next game in the archive
+				replay_record = next(replays, None)
+				if replay_record is not None:
+					replay = Replay(replay_record, offset, board_size, slider)
+			if wheel:
+				replay.step(wheel)
+			if drag_pos:
+				replay.seek_to_pos(drag_pos)
+			if mouse_clicked:
+				if hud.hit(mouse_pos) is exit_button:
+					leave_replay = True
+				else:
+					replay.seek_to_pos(mouse_pos)
+			replay.draw(screen)
+			exit_button.draw(screen)
+			if hud.hit(hover_pos) is exit_button:
+				exit_button.draw_highlight(screen)
+			replay_score_board.draw(screen, replay.board, replay.get_player())
+			if leave_replay:
+				replay = None
+				replays = None
+
+		elif draw_board:
 			if winner != None:
 				game_over = True
 				# set winner if game over
 			elif board.check_game_over():
 				winner = board.get_winner()
+				telemetry.game_end(board, 'over')
+				if record_path:
+					record.save(record_path)
 				# display winner!
 			# make decision
 			else:
@@ -778,13 +2072,20 @@ def main():
 					if vs_ai and current_player == ai.player:
 						move = ai.get_move()
 						if move != Board.NO_MOVES:
-							board.move(current_player,move[1])
+							flips = board.move(current_player,move[1])
+							telemetry.move(board, current_player, move[1].index, flips, ai)
+							record.add_move(board, move[1].index)
+						else:
+							telemetry.pass_turn(board, current_player)
+							record.add_move(board, GameRecord.PASS)
 						# update current player
 						next_player = board.toggle_player(current_player)
 					elif not played:
 						all_player_moves = board.get_all_moves(current_player)
 						if not all_player_moves:
 							next_player = board.toggle_player(current_player)
+							telemetry.pass_turn(board, current_player)
+							record.add_move(board, GameRecord.PASS)
 						# if player is selecting
 						elif mouse_clicked:  
 							#pick up piece an high light moves
@@ -800,7 +2101,9 @@ def main():
 								cell = board.get_intersecting_cell(mouse_pos)
 								if cell in potential_moves:
 									# add the piece to the cell and flip all pieces in between
-									board.move(current_player, cell)
+									flips = board.move(current_player, cell)
+									telemetry.move(board, current_player, cell.index, flips)
+									record.add_move(board, cell.index)
 									next_player = board.toggle_player(current_player)
 									played = True
 									selected_cell = None
@@ -814,24 +2117,30 @@ def main():
 			board.draw(screen)
 			# if cell is celected highlight current piece, and any potential moves
 			#if draw move hints by selecting a random cell that has a move
-			screen.blit(hint_text, hint_button)
-			screen.blit(exit_text, exit_button)
+			hint_button.draw(screen)
+			exit_button.draw(screen)
 			score_board.draw(screen, board, current_player)
+			# highlight the button or cell under the mouse
+			hover = hud.hit(hover_pos)
+			if hover is board_widget:
+				cell = board.get_intersecting_cell(hover_pos)
+				if cell and winner == None:
+					cell.draw_hover(screen)
+			elif hover:
+				hover.draw_highlight(screen)
 			#handle HUD buttons
 			if mouse_clicked:
 				#find hit button
-				hit_button = None
-				for button in hud:
-					if (mouse_pos[0] > button [0] and mouse_pos[0] < button [0]+button [2]) \
-						and (mouse_pos[1] > button [1] and mouse_pos[1] < button [1]+button[3]): 
-						hit_button = button
-						break
+				hit_button = hud.hit(mouse_pos)
 				#if hint show random move
 				if hit_button is hint_button:
 					all_moves = board.get_all_moves(current_player)
-					selected_cell = all_moves[random.randint(0, len(all_moves)-1)][0]
+					if all_moves:
+						selected_cell = all_moves[random.randint(0, len(all_moves)-1)][0]
 				#if exit end play state
 				elif hit_button is exit_button: 
+					if winner == None:
+						telemetry.game_end(board, 'exit')
 					del ai; del board; del score_board
 					start_new_game = False
 					draw_board = False
@@ -861,10 +2170,10 @@ def main():
 				#tries to select size
 				else:
 					menu.select_size(button_id)
-			menu.draw(screen)
+			menu.draw(screen, hover=menu.get_intersecting_button(hover_pos))
 		
 		if game_over: 
-			menu.draw(screen, True)
+			menu.draw(screen, True, menu.get_intersecting_button(hover_pos, True))
 			if mouse_clicked:
 				button = menu.get_intersecting_button(mouse_pos, True)
 				if button == 'RETRY':
@@ -876,9 +2185,28 @@ def main():
 					start_new_game = False
 					game_over = False
 					draw_board = False
+				elif button == 'REPLAY':
+					del ai; del board; del score_board
+					replay = Replay(record, offset, board_size, slider)
+					start_new_game = False
+					game_over = False
+					draw_board = False
 
 		pygame.display.flip()
+		telemetry.frame(time.perf_counter()-frame_start)
+	telemetry.close()
 
 
 if __name__ == '__main__':
-	main()
+	parser = argparse.ArgumentParser(description='Othello/Reversi against an AI.')
+	parser.add_argument('replay', nargs='?', default=None, help='archive of game records to replay')
+	parser.add_argument('--exhibition', type=int, metavar='N', help='play N boards at once')
+	parser.add_argument('--humans', action='store_true', help='humans play black against the AI in the exhibition')
+	parser.add_argument('--size', type=int, default=8, help='dimension of the exhibition boards (default %(default)s)')
+	parser.add_argument('--depth', type=int, default=1, help='moves the exhibition AI searches ahead (default %(default)s)')
+	parser.add_argument('--workers', type=int, default=None, help='AI worker processes (default cpu count)')
+	args = parser.parse_args()
+	if args.exhibition:
+		Exhibition(args.exhibition, args.humans, args.size, args.depth, args.workers).run()
+	else:
+		main(args.replay)